@@ -1,5 +1,7 @@
-from flask import Flask, request, jsonify, g, send_file
+from flask import Flask, Request, request, jsonify, g, send_file, make_response, stream_with_context
+from flask.cli import AppGroup
 from flask_cors import CORS
+import click
 import sqlite3
 import os
 import uuid
@@ -7,7 +9,34 @@ import datetime
 import jwt
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+import csv
+import io
+import json
+import hashlib
+import hmac
+import threading
+import multiprocessing
 import time
+import gzip
+import mimetypes
+from werkzeug.security import safe_join
+from werkzeug.exceptions import RequestEntityTooLarge
+import shutil
+import secrets
+import heapq
+from bisect import bisect_left, insort
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow missing: uploads are served as-is, without variants
+    Image = None
+
+try:
+    import brotli
+except ImportError:  # Brotli missing: only gzip copies are precompressed
+    brotli = None
 
 
 
@@ -16,6 +45,16 @@ CORS(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['DATABASE'] = 'sports_school.db'
+app.config['HASH_WORKERS'] = int(os.getenv('HASH_WORKERS', os.cpu_count() or 1))
+app.config['HASH_QUEUE_SIZE'] = int(os.getenv('HASH_QUEUE_SIZE', app.config['HASH_WORKERS'] * 4))
+app.config['HASH_TIMEOUT'] = float(os.getenv('HASH_TIMEOUT', 10))
+# Request body limits (bytes); bulk imports get their own, larger cap
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 64 * 1024 * 1024))
+app.config['MAX_FILE_SIZE'] = int(os.getenv('MAX_FILE_SIZE', 16 * 1024 * 1024))
+app.config['MAX_IMPORT_SIZE'] = int(os.getenv('MAX_IMPORT_SIZE', 256 * 1024 * 1024))
+# Offload /uploads transfers to a front proxy (see uploaded_file)
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE') == '1'
+app.config['UPLOAD_ACCEL_REDIRECT'] = os.getenv('UPLOAD_ACCEL_REDIRECT')
 
 # Ensure upload directories exist
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
@@ -24,137 +63,404 @@ if not os.path.exists(app.config['UPLOAD_FOLDER']):
     os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'sports'))
     os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'results'))
     os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'sliders'))
+os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'blobs'), exist_ok=True)
 
 # Database helper functions
-def get_db():
-    db = getattr(g, '_database', None)
+# Connections are opened once per thread and reused across requests, so the page
+# cache and parsed schema survive between requests. GET routes use a separate
+# read-only connection.
+DB_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY"
+]
+
+db_local = threading.local()
+
+def connect_db(readonly=False):
+    if readonly:
+        db = sqlite3.connect(f"file:{app.config['DATABASE']}?mode=ro", uri=True)
+    else:
+        db = sqlite3.connect(app.config['DATABASE'])
+        db.execute("PRAGMA journal_mode = WAL")
+    db.row_factory = sqlite3.Row
+    for pragma in DB_PRAGMAS:
+        db.execute(pragma)
+    return db
+
+def get_db(readonly=False):
+    # Forked workers must not share the parent's connections
+    if getattr(db_local, 'pid', None) != os.getpid():
+        db_local.pid = os.getpid()
+        db_local.connections = {}
+
+    key = (app.config['DATABASE'], readonly)
+    db = db_local.connections.get(key)
     if db is None:
-        db = g._database = sqlite3.connect(app.config['DATABASE'])
-        db.row_factory = sqlite3.Row
+        db = db_local.connections[key] = connect_db(readonly)
+
+    used = g.setdefault('_databases', [])
+    if db not in used:
+        used.append(db)
     return db
 
 @app.teardown_appcontext
 def close_connection(exception):
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
+    # Pooled connections stay open; just make sure nothing leaks into the next request
+    for db in g.pop('_databases', []):
+        if db.in_transaction:
+            db.rollback()
+
+# Schema migrations
+# Each migration runs once, in order, inside its own transaction; PRAGMA user_version
+# records how many have been applied. To change the schema, append a new function
+# to MIGRATIONS instead of editing the earlier ones.
+def migration_initial_schema(cursor):
+    # Create Students table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS students (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        phone TEXT,
+        login TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Coaches table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS coaches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        birth_date TEXT,
+        phone TEXT,
+        sport_type_id INTEGER,
+        login TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (sport_type_id) REFERENCES sport_types(id)
+    )
+    ''')
+    
+    # Create Admins table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS admins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        login TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Sliders table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sliders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        school_name TEXT NOT NULL,
+        image_path TEXT,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create News table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS news (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        content TEXT,
+        date TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create News Images table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS news_images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        news_id INTEGER,
+        image_path TEXT,
+        FOREIGN KEY (news_id) REFERENCES news(id) ON DELETE CASCADE
+    )
+    ''')
+    
+    # Create Sport Types table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sport_types (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        image_path TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Training Schedule table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS training_schedule (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        time TEXT NOT NULL,
+        sport_type_id INTEGER,
+        coach_id INTEGER,
+        room TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (sport_type_id) REFERENCES sport_types(id),
+        FOREIGN KEY (coach_id) REFERENCES coaches(id)
+    )
+    ''')
+    
+    # Create Results table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        competition_name TEXT NOT NULL,
+        date TEXT,
+        image_path TEXT,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+def migration_search_and_accounts(cursor):
+    # Create full-text search indexes
+    create_search_indexes(cursor)
+    
+    # One login lookup across all roles; each branch is served by its UNIQUE(login) index
+    cursor.execute('''
+    CREATE VIEW IF NOT EXISTS accounts AS
+        SELECT 1 AS priority, 'admin' AS role, id, login, password, first_name, last_name FROM admins
+        UNION ALL
+        SELECT 2 AS priority, 'coach' AS role, id, login, password, first_name, last_name FROM coaches
+        UNION ALL
+        SELECT 3 AS priority, 'student' AS role, id, login, password, first_name, last_name FROM students
+    ''')
+
+def migration_hot_path_indexes(cursor):
+    # Newest-first feeds: the expression matches ORDER BY IFNULL(date, '') DESC, id DESC
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_date ON news (IFNULL(date, ''), id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_date ON results (IFNULL(date, ''), id)")
+    
+    # Calendar order (date, time, id)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_training_schedule_date_time ON training_schedule (date, time)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_training_schedule_coach ON training_schedule (coach_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_training_schedule_sport ON training_schedule (sport_type_id)")
+    
+    # Covers the batched image lookup, already in (news_id, id) order
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_images_news ON news_images (news_id, id, image_path)")
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_coaches_sport ON coaches (sport_type_id)")
+
+def migration_collection_versions(cursor):
+    # Bumped by every write to a collection; feeds ETag / Last-Modified on the list endpoints
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS collection_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.executemany(
+        "INSERT OR IGNORE INTO collection_versions (name) VALUES (?)",
+        [(name,) for name in COLLECTIONS]
+    )
+
+def migration_image_variants(cursor):
+    # Resized copies generated for each uploaded image (see process_image)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS image_variants (
+        image_path TEXT NOT NULL,
+        variant TEXT NOT NULL,
+        path TEXT NOT NULL,
+        width INTEGER,
+        height INTEGER,
+        PRIMARY KEY (image_path, variant)
+    )
+    ''')
+
+def migration_jobs(cursor):
+    # Durable background job queue (see enqueue_job)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        idempotency_key TEXT UNIQUE,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 5,
+        run_after REAL NOT NULL,
+        last_error TEXT,
+        locked_by TEXT,
+        locked_at REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after)")
 
+def migration_blobs(cursor):
+    # Content-addressed uploads, shared by every record that references them (see save_file)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS blobs (
+        path TEXT PRIMARY KEY,
+        digest TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        refcount INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+def migration_schedule_weeks(cursor):
+    # Calendar ranges per coach / per sport type, in (date, time) order
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_training_schedule_coach_date ON training_schedule (coach_id, date, time)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_training_schedule_sport_date ON training_schedule (sport_type_id, date, time)")
+    cursor.execute("DROP INDEX IF EXISTS idx_training_schedule_coach")
+    cursor.execute("DROP INDEX IF EXISTS idx_training_schedule_sport")
+
+    # Precomputed week views (see refresh_schedule_weeks)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schedule_weeks (
+        week_start TEXT PRIMARY KEY,
+        sessions TEXT NOT NULL,
+        refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+def migration_training_series(cursor):
+    # Weekly recurrence rules, expanded on read (see iter_schedule)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS training_series (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        weekdays TEXT NOT NULL,
+        interval_weeks INTEGER NOT NULL DEFAULT 1,
+        time TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        end_date TEXT,
+        sport_type_id INTEGER,
+        coach_id INTEGER,
+        room TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (sport_type_id) REFERENCES sport_types(id),
+        FOREIGN KEY (coach_id) REFERENCES coaches(id)
+    )
+    ''')
+
+    # Cancelled occurrences
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS training_series_exceptions (
+        series_id INTEGER NOT NULL,
+        occurrence_date TEXT NOT NULL,
+        PRIMARY KEY (series_id, occurrence_date)
+    ) WITHOUT ROWID
+    ''')
+
+    # Overridden occurrences are ordinary schedule rows that remember which one they replace
+    cursor.execute("ALTER TABLE training_schedule ADD COLUMN series_id INTEGER REFERENCES training_series(id)")
+    cursor.execute("ALTER TABLE training_schedule ADD COLUMN occurrence_date TEXT")
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_training_schedule_occurrence
+    ON training_schedule (series_id, occurrence_date) WHERE series_id IS NOT NULL
+    ''')
+
+    # Stored weeks predate series; they are rebuilt as the schedule changes
+    cursor.execute("DELETE FROM schedule_weeks")
+
+def migration_schedule_durations(cursor):
+    # Session length in minutes, for conflict detection (see ScheduleIntervals)
+    cursor.execute("ALTER TABLE training_schedule ADD COLUMN duration INTEGER NOT NULL DEFAULT 60")
+    cursor.execute("ALTER TABLE training_series ADD COLUMN duration INTEGER NOT NULL DEFAULT 60")
+    # Per-room day lookups, like (coach_id, date, time) for coaches
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_training_schedule_room_date ON training_schedule (room, date, time)")
+    cursor.execute("DELETE FROM schedule_weeks")
+
+def migration_token_generations(cursor):
+    # Bumping a user's generation revokes every token issued before (see token_required)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS token_generations (
+        role TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        generation INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (role, user_id)
+    ) WITHOUT ROWID
+    ''')
+
+def migration_refresh_tokens(cursor):
+    # Only digests are stored; a family is one login's chain of rotated tokens
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        token_hash TEXT PRIMARY KEY,
+        family TEXT NOT NULL,
+        role TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        used_at REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family ON refresh_tokens (family)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user ON refresh_tokens (role, user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires ON refresh_tokens (expires_at)")
+
+def migration_phone_search(cursor):
+    # Trigram phone indexes and the sport type delete trigger (see SEARCH_INDEXES)
+    create_search_indexes(cursor)
+    # Coaches whose sport type was deleted before the trigger existed
+    cursor.execute('''
+    UPDATE coaches_fts SET sport_name = (
+        SELECT s.name FROM coaches c JOIN sport_types s ON c.sport_type_id = s.id WHERE c.id = coaches_fts.rowid
+    )
+    ''')
+
+def migration_backfill_schedule_weeks(cursor):
+    # Migrations 9 and 10 emptied schedule_weeks; refill it now that every column
+    # iter_schedule reads exists
+    rebuild_schedule_weeks(cursor)
+
+MIGRATIONS = [
+    migration_initial_schema,
+    migration_search_and_accounts,
+    migration_hot_path_indexes,
+    migration_collection_versions,
+    migration_image_variants,
+    migration_jobs,
+    migration_blobs,
+    migration_schedule_weeks,
+    migration_training_series,
+    migration_schedule_durations,
+    migration_token_generations,
+    migration_refresh_tokens,
+    migration_phone_search,
+    migration_backfill_schedule_weeks
+]
+
+def migrate_db(db):
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        db.execute("BEGIN")
+        try:
+            migration(db.cursor())
+            db.execute(f"PRAGMA user_version = {number}")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return len(MIGRATIONS)
+
+# Runs once at startup (create_app, `flask db init`), never while serving requests.
+# Uses its own connection so nothing opened here is inherited by forked workers.
 def init_db():
-    with app.app_context():
-        db = get_db()
+    db = connect_db()
+    try:
+        migrate_db(db)
         cursor = db.cursor()
         
-        # Create Students table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS students (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            phone TEXT,
-            login TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create Coaches table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS coaches (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            birth_date TEXT,
-            phone TEXT,
-            sport_type_id INTEGER,
-            login TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (sport_type_id) REFERENCES sport_types(id)
-        )
-        ''')
-        
-        # Create Admins table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS admins (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            login TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create Sliders table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sliders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            school_name TEXT NOT NULL,
-            image_path TEXT,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create News table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS news (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            content TEXT,
-            date TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create News Images table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS news_images (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            news_id INTEGER,
-            image_path TEXT,
-            FOREIGN KEY (news_id) REFERENCES news(id) ON DELETE CASCADE
-        )
-        ''')
-        
-        # Create Sport Types table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sport_types (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT,
-            image_path TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create Training Schedule table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS training_schedule (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            time TEXT NOT NULL,
-            sport_type_id INTEGER,
-            coach_id INTEGER,
-            room TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (sport_type_id) REFERENCES sport_types(id),
-            FOREIGN KEY (coach_id) REFERENCES coaches(id)
-        )
-        ''')
-        
-        # Create Results table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            competition_name TEXT NOT NULL,
-            date TEXT,
-            image_path TEXT,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
         # Create default admin if not exists
         cursor.execute("SELECT COUNT(*) FROM admins")
         if cursor.fetchone()[0] == 0:
@@ -165,6 +471,494 @@ def init_db():
             )
         
         db.commit()
+    finally:
+        db.close()
+
+# Database CLI: `flask --app app db init` / `flask --app app db migrate`
+db_cli = AppGroup('db', help='Database schema commands.')
+
+@db_cli.command('init')
+def init_db_command():
+    init_db()
+    click.echo(f"Database ready at schema version {len(MIGRATIONS)}.")
+
+@db_cli.command('migrate')
+def migrate_db_command():
+    db = connect_db()
+    try:
+        before = db.execute("PRAGMA user_version").fetchone()[0]
+        after = migrate_db(db)
+    finally:
+        db.close()
+    if before == after:
+        click.echo(f"Already at schema version {after}.")
+    else:
+        click.echo(f"Migrated schema from version {before} to {after}.")
+
+app.cli.add_command(db_cli)
+
+# Small thread-safe LRU with per-entry expiry
+class TTLCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_if(self, predicate):
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+# Password hashing runs in a process pool so request threads never burn CPU on it.
+# A bounded number of jobs may be in flight; beyond that callers get a 503. A job
+# keeps its slot until its tasks have finished, even when the caller stopped waiting
+# for them after HASH_TIMEOUT (also a 503), so the bound holds for the pool itself.
+# The waiting request thread only sleeps; gunicorn.conf.py runs threaded workers so
+# other requests are served meanwhile.
+class HashingBusy(Exception):
+    pass
+
+hashing_lock = threading.Lock()
+hashing_state = {'pid': None, 'pool': None, 'slots': None}
+hashing_metrics = {
+    'in_flight': 0,
+    'completed': 0,
+    'rejected': 0,
+    'timed_out': 0,
+    'latency_total_ms': 0.0,
+    'latency_max_ms': 0.0
+}
+
+# The pool is started from threaded workers; forking such a process can hand the
+# children locks another thread held, so they come from a clean forkserver (spawn
+# where that is unavailable)
+HASHING_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+def get_hashing_pool():
+    # Pools don't survive fork, so each gunicorn worker builds its own
+    with hashing_lock:
+        if hashing_state['pid'] != os.getpid():
+            hashing_state['pool'] = ProcessPoolExecutor(
+                max_workers=app.config['HASH_WORKERS'],
+                mp_context=multiprocessing.get_context(HASHING_START_METHOD)
+            )
+            hashing_state['slots'] = threading.BoundedSemaphore(app.config['HASH_QUEUE_SIZE'])
+            hashing_state['pid'] = os.getpid()
+        return hashing_state['pool'], hashing_state['slots']
+
+def run_hashing_tasks(calls, timeout=None):
+    # Runs [(fn, args), ...] in the pool as one job and returns their results in order
+    pool, slots = get_hashing_pool()
+    if not slots.acquire(blocking=False):
+        with hashing_lock:
+            hashing_metrics['rejected'] += 1
+        raise HashingBusy()
+
+    with hashing_lock:
+        hashing_metrics['in_flight'] += 1
+    started = time.perf_counter()
+    # One count per task, plus one held until every task has been submitted
+    remaining = [len(calls) + 1]
+
+    def task_finished(future):
+        with hashing_lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+            elapsed = (time.perf_counter() - started) * 1000
+            hashing_metrics['in_flight'] -= 1
+            hashing_metrics['completed'] += 1
+            hashing_metrics['latency_total_ms'] += elapsed
+            hashing_metrics['latency_max_ms'] = max(hashing_metrics['latency_max_ms'], elapsed)
+        slots.release()
+
+    futures = []
+    try:
+        for fn, args in calls:
+            future = pool.submit(fn, *args)
+            futures.append(future)
+            future.add_done_callback(task_finished)
+    finally:
+        # Tasks that were never submitted count as finished
+        for _ in range(len(calls) - len(futures) + 1):
+            task_finished(None)
+
+    _, pending = wait(futures, timeout=timeout)
+    if pending:
+        with hashing_lock:
+            hashing_metrics['timed_out'] += 1
+        raise HashingBusy()
+    return [future.result() for future in futures]
+
+def run_hashing(fn, *args):
+    return run_hashing_tasks([(fn, args)], app.config['HASH_TIMEOUT'])[0]
+
+def hash_password(password):
+    return run_hashing(generate_password_hash, password)
+
+def verify_password(stored_hash, password):
+    return run_hashing(check_password_hash, stored_hash, password)
+
+def generate_password_hashes(passwords):
+    return [generate_password_hash(password) for password in passwords]
+
+# Hash a whole import batch across every pool process; takes a single queue slot
+def hash_passwords(passwords):
+    chunksize = max(1, len(passwords) // (app.config['HASH_WORKERS'] * 4))
+    chunks = [passwords[i:i + chunksize] for i in range(0, len(passwords), chunksize)]
+    results = run_hashing_tasks([(generate_password_hashes, (chunk,)) for chunk in chunks])
+    return [hashed for chunk in results for hashed in chunk]
+
+@app.errorhandler(HashingBusy)
+def hashing_busy(error):
+    response = jsonify({'message': 'Server is busy, please try again!'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+# Recently verified logins, so a device re-logging in quickly skips the slow hash check.
+# The digest is bound to the stored hash, so a changed password never matches a cached entry.
+CREDENTIAL_CACHE_SIZE = 1024
+CREDENTIAL_CACHE_TTL = 300
+credential_cache = TTLCache(CREDENTIAL_CACHE_SIZE, CREDENTIAL_CACHE_TTL)
+
+def credential_digest(stored_hash, password):
+    key = (app.config['SECRET_KEY'] or '').encode()
+    return hmac.new(key, f'{stored_hash}\0{password}'.encode(), hashlib.sha256).hexdigest()
+
+def check_credentials(login, stored_hash, password):
+    digest = credential_digest(stored_hash, password)
+    cached = credential_cache.get(login)
+    if cached and hmac.compare_digest(cached, digest):
+        return True
+    if not verify_password(stored_hash, password):
+        return False
+    credential_cache.set(login, digest)
+    return True
+
+def forget_credentials(login):
+    credential_cache.pop(login)
+
+# Full-text search (SQLite FTS5)
+# students, news and results index their base table directly (external content);
+# coaches keep their own copy because the sport name comes from a join.
+SEARCH_INDEXES = {
+    'students_fts': {
+        'create': """
+            CREATE VIRTUAL TABLE students_fts USING fts5(
+                first_name, last_name, phone, login,
+                content='students', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """,
+        'populate': "INSERT INTO students_fts(students_fts) VALUES('rebuild')",
+        'triggers': [
+            """CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN
+                INSERT INTO students_fts(rowid, first_name, last_name, phone, login)
+                VALUES (new.id, new.first_name, new.last_name, new.phone, new.login);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN
+                INSERT INTO students_fts(students_fts, rowid, first_name, last_name, phone, login)
+                VALUES ('delete', old.id, old.first_name, old.last_name, old.phone, old.login);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE OF first_name, last_name, phone, login ON students BEGIN
+                INSERT INTO students_fts(students_fts, rowid, first_name, last_name, phone, login)
+                VALUES ('delete', old.id, old.first_name, old.last_name, old.phone, old.login);
+                INSERT INTO students_fts(rowid, first_name, last_name, phone, login)
+                VALUES (new.id, new.first_name, new.last_name, new.phone, new.login);
+            END"""
+        ]
+    },
+    'coaches_fts': {
+        'create': """
+            CREATE VIRTUAL TABLE coaches_fts USING fts5(
+                first_name, last_name, phone, login, sport_name,
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """,
+        'populate': """
+            INSERT INTO coaches_fts(rowid, first_name, last_name, phone, login, sport_name)
+            SELECT c.id, c.first_name, c.last_name, c.phone, c.login, s.name
+            FROM coaches c LEFT JOIN sport_types s ON c.sport_type_id = s.id
+        """,
+        'triggers': [
+            """CREATE TRIGGER IF NOT EXISTS coaches_fts_ai AFTER INSERT ON coaches BEGIN
+                INSERT INTO coaches_fts(rowid, first_name, last_name, phone, login, sport_name)
+                VALUES (new.id, new.first_name, new.last_name, new.phone, new.login,
+                        (SELECT name FROM sport_types WHERE id = new.sport_type_id));
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS coaches_fts_ad AFTER DELETE ON coaches BEGIN
+                DELETE FROM coaches_fts WHERE rowid = old.id;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS coaches_fts_au AFTER UPDATE ON coaches BEGIN
+                DELETE FROM coaches_fts WHERE rowid = old.id;
+                INSERT INTO coaches_fts(rowid, first_name, last_name, phone, login, sport_name)
+                VALUES (new.id, new.first_name, new.last_name, new.phone, new.login,
+                        (SELECT name FROM sport_types WHERE id = new.sport_type_id));
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS coaches_fts_sport_au AFTER UPDATE OF name ON sport_types BEGIN
+                UPDATE coaches_fts SET sport_name = new.name
+                WHERE rowid IN (SELECT id FROM coaches WHERE sport_type_id = new.id);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS coaches_fts_sport_ad AFTER DELETE ON sport_types BEGIN
+                UPDATE coaches_fts SET sport_name = NULL
+                WHERE rowid IN (SELECT id FROM coaches WHERE sport_type_id = old.id);
+            END"""
+        ]
+    },
+    # Phone numbers are matched anywhere inside (e.g. the last digits), like the old
+    # LIKE '%term%' search, through trigram indexes
+    'students_phone_fts': {
+        'create': """
+            CREATE VIRTUAL TABLE students_phone_fts USING fts5(
+                phone, content='students', content_rowid='id', tokenize='trigram'
+            )
+        """,
+        'populate': "INSERT INTO students_phone_fts(students_phone_fts) VALUES('rebuild')",
+        'triggers': [
+            """CREATE TRIGGER IF NOT EXISTS students_phone_fts_ai AFTER INSERT ON students BEGIN
+                INSERT INTO students_phone_fts(rowid, phone) VALUES (new.id, new.phone);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS students_phone_fts_ad AFTER DELETE ON students BEGIN
+                INSERT INTO students_phone_fts(students_phone_fts, rowid, phone) VALUES ('delete', old.id, old.phone);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS students_phone_fts_au AFTER UPDATE OF phone ON students BEGIN
+                INSERT INTO students_phone_fts(students_phone_fts, rowid, phone) VALUES ('delete', old.id, old.phone);
+                INSERT INTO students_phone_fts(rowid, phone) VALUES (new.id, new.phone);
+            END"""
+        ]
+    },
+    'coaches_phone_fts': {
+        'create': """
+            CREATE VIRTUAL TABLE coaches_phone_fts USING fts5(
+                phone, content='coaches', content_rowid='id', tokenize='trigram'
+            )
+        """,
+        'populate': "INSERT INTO coaches_phone_fts(coaches_phone_fts) VALUES('rebuild')",
+        'triggers': [
+            """CREATE TRIGGER IF NOT EXISTS coaches_phone_fts_ai AFTER INSERT ON coaches BEGIN
+                INSERT INTO coaches_phone_fts(rowid, phone) VALUES (new.id, new.phone);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS coaches_phone_fts_ad AFTER DELETE ON coaches BEGIN
+                INSERT INTO coaches_phone_fts(coaches_phone_fts, rowid, phone) VALUES ('delete', old.id, old.phone);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS coaches_phone_fts_au AFTER UPDATE OF phone ON coaches BEGIN
+                INSERT INTO coaches_phone_fts(coaches_phone_fts, rowid, phone) VALUES ('delete', old.id, old.phone);
+                INSERT INTO coaches_phone_fts(rowid, phone) VALUES (new.id, new.phone);
+            END"""
+        ]
+    },
+    'news_fts': {
+        'create': """
+            CREATE VIRTUAL TABLE news_fts USING fts5(
+                title, content,
+                content='news', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """,
+        'populate': "INSERT INTO news_fts(news_fts) VALUES('rebuild')",
+        'triggers': [
+            """CREATE TRIGGER IF NOT EXISTS news_fts_ai AFTER INSERT ON news BEGIN
+                INSERT INTO news_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS news_fts_ad AFTER DELETE ON news BEGIN
+                INSERT INTO news_fts(news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS news_fts_au AFTER UPDATE OF title, content ON news BEGIN
+                INSERT INTO news_fts(news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO news_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END"""
+        ]
+    },
+    'results_fts': {
+        'create': """
+            CREATE VIRTUAL TABLE results_fts USING fts5(
+                competition_name, description,
+                content='results', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """,
+        'populate': "INSERT INTO results_fts(results_fts) VALUES('rebuild')",
+        'triggers': [
+            """CREATE TRIGGER IF NOT EXISTS results_fts_ai AFTER INSERT ON results BEGIN
+                INSERT INTO results_fts(rowid, competition_name, description)
+                VALUES (new.id, new.competition_name, new.description);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS results_fts_ad AFTER DELETE ON results BEGIN
+                INSERT INTO results_fts(results_fts, rowid, competition_name, description)
+                VALUES ('delete', old.id, old.competition_name, old.description);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS results_fts_au AFTER UPDATE OF competition_name, description ON results BEGIN
+                INSERT INTO results_fts(results_fts, rowid, competition_name, description)
+                VALUES ('delete', old.id, old.competition_name, old.description);
+                INSERT INTO results_fts(rowid, competition_name, description)
+                VALUES (new.id, new.competition_name, new.description);
+            END"""
+        ]
+    }
+}
+
+def create_search_indexes(cursor):
+    for name, index in SEARCH_INDEXES.items():
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+        if not cursor.fetchone():
+            cursor.execute(index['create'])
+            # Index rows that existed before the search table was created
+            cursor.execute(index['populate'])
+        for trigger in index['triggers']:
+            cursor.execute(trigger)
+
+# Turn user input into a prefix query: every word must match the start of a token
+def fts_query(term, columns=None):
+    words = [w.replace('"', '""') for w in term.split()]
+    words = [w for w in words if w.strip('"')]
+    if not words:
+        return None
+    query = ' '.join(f'"{w}"*' for w in words)
+    if columns:
+        query = '{' + ' '.join(columns) + '} : (' + query + ')'
+    return query
+
+# A term that looks like part of a phone number, as a trigram substring query
+def phone_query(term):
+    term = term.strip()
+    if len(term) < 3 or not any(ch.isdigit() for ch in term) or not all(ch.isdigit() or ch in '+-() ' for ch in term):
+        return None
+    return f'"{term}"'
+
+# WHERE conditions for a list endpoint's search parameter: word prefixes through
+# <table>_fts, or-ed with a phone substring match for digit terms
+def search_conditions(term, table, prefix='', columns=None):
+    query = fts_query(term, columns)
+    if not query:
+        return [], []
+    condition = f"{prefix}id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)"
+    params = [query]
+    phone = phone_query(term)
+    if phone:
+        condition = f"({condition} OR {prefix}id IN (SELECT rowid FROM {table}_phone_fts WHERE {table}_phone_fts MATCH ?))"
+        params.append(phone)
+    return [condition], params
+
+# Tokens
+# Access tokens are short-lived JWTs carrying only id, role and generation; clients
+# renew them at /token/refresh with an opaque refresh token, which is stored hashed
+# and rotated on every use. Verified access tokens are cached by digest until they
+# expire, so repeat requests skip the signature check. Bumping a user's generation
+# (password change, deletion) revokes all older access tokens and drops the user's
+# refresh tokens. Workers keep the generations in memory and reload them only when
+# the token_generations collection version moves, checking that at most every few
+# seconds.
+ACCESS_TOKEN_LIFETIME = datetime.timedelta(minutes=int(os.getenv('ACCESS_TOKEN_MINUTES', 15)))
+REFRESH_TOKEN_LIFETIME = datetime.timedelta(days=int(os.getenv('REFRESH_TOKEN_DAYS', 30)))
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 3600
+TOKEN_GENERATIONS_REFRESH = 5
+
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+token_generations_lock = threading.Lock()
+token_generations_state = {'generations': {}, 'version': None, 'checked_at': 0.0}
+
+def token_generation(cursor, role, user_id):
+    cursor.execute("SELECT generation FROM token_generations WHERE role = ? AND user_id = ?", (role, user_id))
+    row = cursor.fetchone()
+    return row['generation'] if row else 0
+
+def issue_token(cursor, user_id, role):
+    return jwt.encode({
+        'id': user_id,
+        'role': role,
+        'gen': token_generation(cursor, role, user_id),
+        'exp': datetime.datetime.utcnow() + ACCESS_TOKEN_LIFETIME
+    }, app.config['SECRET_KEY'], algorithm="HS256")
+
+def refresh_token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_refresh_token(cursor, user_id, role, family=None):
+    token = secrets.token_urlsafe(32)
+    cursor.connection.execute(
+        "INSERT INTO refresh_tokens (token_hash, family, role, user_id, expires_at) VALUES (?, ?, ?, ?, ?)",
+        (
+            refresh_token_hash(token), family or uuid.uuid4().hex, role, user_id,
+            time.time() + REFRESH_TOKEN_LIFETIME.total_seconds()
+        )
+    )
+    return token
+
+def token_pair(cursor, user_id, role, family=None):
+    # The caller commits
+    return {
+        'token': issue_token(cursor, user_id, role),
+        'refresh_token': issue_refresh_token(cursor, user_id, role, family),
+        'expires_in': int(ACCESS_TOKEN_LIFETIME.total_seconds())
+    }
+
+def revoke_tokens(cursor, role, user_id):
+    # Called in the same transaction as the change that makes the tokens unsafe
+    cursor.connection.execute(
+        """INSERT INTO token_generations (role, user_id, generation) VALUES (?, ?, 1)
+        ON CONFLICT(role, user_id) DO UPDATE SET generation = generation + 1""",
+        (role, user_id)
+    )
+    cursor.connection.execute("DELETE FROM refresh_tokens WHERE role = ? AND user_id = ?", (role, user_id))
+    bump_versions(cursor, 'token_generations')
+    # Let this worker notice on its next request instead of after the refresh interval,
+    # once the bump is committed (see reload_token_generations)
+    g.tokens_revoked = True
+
+@app.teardown_appcontext
+def reload_token_generations(exception):
+    # Runs after the handler committed. Taking the lock waits out a reload that may
+    # have read the generations before the commit, so it can't keep them fresh.
+    if g.pop('tokens_revoked', False):
+        with token_generations_lock:
+            token_generations_state['checked_at'] = 0.0
+
+def current_token_generations():
+    state = token_generations_state
+    if time.monotonic() - state['checked_at'] < TOKEN_GENERATIONS_REFRESH:
+        return state['generations']
+    with token_generations_lock:
+        if time.monotonic() - state['checked_at'] >= TOKEN_GENERATIONS_REFRESH:
+            version = get_versions(['token_generations']).get('token_generations', (0, None))[0]
+            if version != state['version']:
+                rows = get_db(readonly=True).execute("SELECT role, user_id, generation FROM token_generations").fetchall()
+                state['generations'] = {(row['role'], row['user_id']): row['generation'] for row in rows}
+                state['version'] = version
+            state['checked_at'] = time.monotonic()
+    return state['generations']
 
 # JWT token verification decorator
 def token_required(f):
@@ -178,17 +972,27 @@ def token_required(f):
         if not token:
             return jsonify({'message': 'Token is missing!'}), 401
         
-        try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = {
-                'id': data['id'],
-                'role': data['role'],
-                'login': data['login']
-            }
-        except:
-            return jsonify({'message': 'Token is invalid!'}), 401
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached = token_cache.get(cache_key)
+        if cached is None:
+            try:
+                data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+                cached = (
+                    {
+                        'id': data['id'],
+                        'role': data['role']
+                    },
+                    data.get('gen', 0)
+                )
+            except:
+                return jsonify({'message': 'Token is invalid!'}), 401
+            token_cache.set(cache_key, cached, min(TOKEN_CACHE_TTL, data.get('exp', 0) - time.time()))
         
-        return f(current_user, *args, **kwargs)
+        current_user, generation = cached
+        if generation < current_token_generations().get((current_user['role'], current_user['id']), 0):
+            return jsonify({'message': 'Token has been revoked!'}), 401
+        
+        return f(dict(current_user), *args, **kwargs)
     
     return decorated
 
@@ -203,6 +1007,320 @@ def role_required(roles):
         return decorated_function
     return decorator
 
+# Collection versions and conditional GETs
+COLLECTIONS = ['students', 'coaches', 'sliders', 'news', 'sport_types', 'training_schedule', 'results']
+
+# Encoded JSON bodies of list responses. Keys embed the collection versions, so
+# other workers' writes (which bump the shared versions table) are never served
+# stale; local writes also drop their entries right away to free the memory.
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL = 300
+RESPONSE_CACHE_MAX_BODY = 1024 * 1024
+response_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+def bump_versions(cursor, *names):
+    # Called in the same transaction as the write it describes. Runs on its own cursor
+    # so the caller's cursor.rowcount / lastrowid still describe that write.
+    cursor.connection.executemany(
+        """INSERT INTO collection_versions (name, version, updated_at) VALUES (?, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP""",
+        [(name,) for name in names]
+    )
+    response_cache.discard_if(lambda key: any(name in key[0] for name in names))
+
+def get_versions(names):
+    db = get_db(readonly=True)
+    placeholders = ', '.join('?' * len(names))
+    rows = db.execute(
+        f"SELECT name, version, updated_at FROM collection_versions WHERE name IN ({placeholders})",
+        names
+    ).fetchall()
+    return {row['name']: (row['version'], row['updated_at']) for row in rows}
+
+def versioned(*collections, vary_on=None):
+    # Versions are read before the handler queries, so a write racing with this request
+    # can only make the ETag look older than the body, never newer. vary_on returns any
+    # other state the body depends on (e.g. today's date); such responses get no
+    # Last-Modified, since it can't express that state. Neither do responses within a
+    # second of the last write: updated_at has one-second resolution, so a second
+    # write in that second would not move it (clients then revalidate by ETag).
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(current_user, *args, **kwargs):
+            versions = get_versions(collections)
+            key = repr((request.path, sorted(request.args.items(multi=True)), current_user['role'],
+                        [versions.get(name, (0, None))[0] for name in collections],
+                        vary_on() if vary_on else None))
+            etag = hashlib.sha1(key.encode()).hexdigest()
+
+            timestamps = [updated_at for _, updated_at in versions.values() if updated_at]
+            last_modified = None
+            if timestamps and vary_on is None:
+                last_modified = datetime.datetime.strptime(max(timestamps), '%Y-%m-%d %H:%M:%S').replace(
+                    tzinfo=datetime.timezone.utc)
+                if datetime.datetime.now(datetime.timezone.utc) - last_modified < datetime.timedelta(seconds=1):
+                    last_modified = None
+
+            # Compressed bodies carry the encoding in their ETag, so any of them matches
+            not_modified = False
+            matched_etag = None
+            if request.if_none_match:
+                matched_etag = next((etag + suffix for suffix in ETAG_ENCODING_SUFFIXES
+                                     if request.if_none_match.contains(etag + suffix)), None)
+                not_modified = matched_etag is not None
+            elif request.if_modified_since and last_modified:
+                not_modified = last_modified <= request.if_modified_since
+
+            cache_key = (collections, etag)
+            cached = None if not_modified else response_cache.get(cache_key)
+
+            if not_modified:
+                response = app.response_class(status=304)
+            elif cached is not None:
+                response = app.response_class(cached, mimetype='application/json')
+                g.response_cache_key = cache_key
+            else:
+                response = make_response(f(current_user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if not response.is_streamed and response.content_length <= RESPONSE_CACHE_MAX_BODY:
+                    response_cache.set(cache_key, response.get_data())
+                    g.response_cache_key = cache_key
+
+            response.set_etag(matched_etag or etag)
+            if last_modified:
+                response.last_modified = last_modified
+            # Authenticated data: clients may keep it but must revalidate every time
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+# Response compression
+# JSON bodies above COMPRESS_MIN_SIZE are sent brotli- or gzip-encoded, whichever the
+# client prefers (brotli on ties). The ETag gets a per-encoding suffix, since each
+# encoding is a different representation. Bodies that came from response_cache keep
+# their compressed variants next to them, so repeat hits never re-compress.
+# Streamed and file responses (send_file, exports) are left alone.
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_MIMETYPES = {'application/json'}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+RESPONSE_ENCODINGS = (['br'] if brotli else []) + ['gzip']
+ETAG_ENCODING_SUFFIXES = ('', '-br', '-gzip')
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESS_MIMETYPES or 'Content-Encoding' in response.headers
+            or response.content_length < COMPRESS_MIN_SIZE):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(RESPONSE_ENCODINGS)
+    if encoding is None:
+        return response
+
+    cache_key = g.get('response_cache_key')
+    body = response_cache.get(cache_key + (encoding,)) if cache_key else None
+    if body is None:
+        body = compress_body(response.get_data(), encoding)
+        if cache_key:
+            response_cache.set(cache_key + (encoding,), body)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    return response
+
+# Keyset pagination helpers
+# Pages are opt-in: a list request without limit / after_* still gets the complete
+# bare JSON array existing clients expect (limit is None then).
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+PAGE_ARGS = ('limit', 'after_id', 'after_date', 'after_time', 'after_series_id')
+
+def paged_request():
+    return any(arg in request.args for arg in PAGE_ARGS)
+
+def get_page_args(paged=None):
+    limit = None
+    if paged or (paged is None and paged_request()):
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after_id = request.args.get('after_id', type=int)
+    after_date = request.args.get('after_date')
+    return limit, after_id, after_date
+
+def fetch_limit(limit):
+    # LIMIT for the query: one extra row to detect a next page, -1 for no limit
+    return -1 if limit is None else limit + 1
+
+def where_clause(conditions):
+    if not conditions:
+        return ''
+    return ' WHERE ' + ' AND '.join(conditions)
+
+def paginate(rows, limit, cursor_for):
+    # Queries fetch one extra row so we know whether another page exists
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, cursor_for(rows[-1])
+
+def page_response(items, next_cursor):
+    if not paged_request():
+        return jsonify(items)
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
+def id_cursor(row):
+    return {'after_id': row['id']}
+
+def date_desc_cursor(row):
+    return {'after_date': row['date'] or '', 'after_id': row['id']}
+
+# Newest first, NULL dates last (same order as ORDER BY date DESC)
+def date_desc_conditions(after_date, after_id, prefix=''):
+    if after_date is None:
+        if after_id is None:
+            return [], []
+        return [f"{prefix}id < ?"], [after_id]
+    if after_id is None:
+        return [f"IFNULL({prefix}date, '') < ?"], [after_date]
+    # Written so the leading term is a plain range that can seek the (IFNULL(date, ''), id) index
+    return (
+        [f"IFNULL({prefix}date, '') <= ?", f"(IFNULL({prefix}date, '') < ? OR {prefix}id < ?)"],
+        [after_date, after_date, after_id]
+    )
+
+# Field projection (?fields=id,first_name)
+# Each collection maps its public fields to SQL expressions, and only the requested
+# ones are selected. Fields built in Python (None here) name the column they need in
+# FIELD_SOURCES; columns the page cursor needs are always selected.
+NEWS_SUMMARY_LENGTH = 200
+FIELD_SOURCES = {'image_srcset': 'image_path', 'images': 'id', 'images_srcset': 'id'}
+
+def requested_fields(fields, default=None):
+    # Names from ?fields= (all of default, or of fields, when absent).
+    # Returns (names, error message).
+    requested = request.args.get('fields', '')
+    names = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+    for name in names:
+        if name not in fields:
+            return None, f'Unknown field: {name}!'
+    return names or list(default or fields), None
+
+def select_fields(fields, default=None, required=('id',)):
+    names, error = requested_fields(fields, default)
+    if error:
+        return None, None, error
+
+    columns = list(required)
+    for name in names:
+        column = name if fields[name] is not None else FIELD_SOURCES[name]
+        if column not in columns:
+            columns.append(column)
+    select = ', '.join(fields[column] if fields[column] == column else f'{fields[column]} AS {column}'
+                       for column in columns)
+    return names, select, None
+
+def project(row, names, derived=None):
+    # derived maps a Python-built field to a function of the row
+    derived = derived or {}
+    return {name: derived[name](row) if name in derived else row[name] for name in names}
+
+STUDENT_FIELDS = {
+    'id': 'id', 'first_name': 'first_name', 'last_name': 'last_name', 'phone': 'phone',
+    'login': 'login', 'created_at': 'created_at'
+}
+STUDENT_VIEW_FIELDS = {'id': 'id', 'first_name': 'first_name', 'last_name': 'last_name', 'phone': 'phone'}
+COACH_FIELDS = {
+    'id': 'c.id', 'first_name': 'c.first_name', 'last_name': 'c.last_name', 'birth_date': 'c.birth_date',
+    'phone': 'c.phone', 'sport_type_id': 'c.sport_type_id', 'sport_name': 's.name', 'login': 'c.login',
+    'created_at': 'c.created_at'
+}
+COACH_VIEW_FIELDS = {
+    'id': 'c.id', 'first_name': 'c.first_name', 'last_name': 'c.last_name', 'birth_date': 'c.birth_date',
+    'phone': 'c.phone', 'sport_name': 's.name'
+}
+SLIDER_FIELDS = {
+    'id': 'id', 'school_name': 'school_name', 'image_path': 'image_path', 'image_srcset': None,
+    'description': 'description', 'created_at': 'created_at'
+}
+NEWS_FIELDS = {
+    'id': 'id', 'title': 'title', 'content': 'content', 'date': 'date', 'created_at': 'created_at',
+    'images': None, 'images_srcset': None,
+    # Excerpt cut in SQL, so the full body never leaves the database
+    'summary': f"""CASE WHEN length(content) > {NEWS_SUMMARY_LENGTH}
+        THEN rtrim(substr(content, 1, {NEWS_SUMMARY_LENGTH})) || '…' ELSE content END"""
+}
+NEWS_DEFAULT_FIELDS = ['id', 'title', 'content', 'date', 'created_at', 'images', 'images_srcset']
+NEWS_SUMMARY_FIELDS = ['id', 'title', 'summary', 'date', 'created_at', 'images', 'images_srcset']
+SPORT_TYPE_FIELDS = {
+    'id': 'id', 'name': 'name', 'description': 'description', 'image_path': 'image_path',
+    'image_srcset': None, 'created_at': 'created_at'
+}
+RESULT_FIELDS = {
+    'id': 'id', 'competition_name': 'competition_name', 'date': 'date', 'image_path': 'image_path',
+    'image_srcset': None, 'description': 'description', 'created_at': 'created_at'
+}
+
+# Streaming exports
+# Rows are pulled with fetchmany and encoded batch by batch, so an export of any size
+# runs in constant memory and the first bytes go out before the query is finished.
+# The format follows the Accept header: a JSON array (default), NDJSON or CSV.
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = ['application/json', 'application/x-ndjson', 'text/csv']
+
+def export_format():
+    return request.accept_mimetypes.best_match(EXPORT_FORMATS, default='application/json')
+
+def export_chunks(cursor, names, mimetype):
+    try:
+        if mimetype == 'text/csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            yield buffer.getvalue()
+        elif mimetype == 'application/json':
+            yield '['
+        first = True
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            if mimetype == 'text/csv':
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([row[name] for name in names] for row in rows)
+                yield buffer.getvalue()
+            elif mimetype == 'application/x-ndjson':
+                yield ''.join(app.json.dumps(project(row, names)) + '\n' for row in rows)
+            else:
+                chunk = ','.join(app.json.dumps(project(row, names)) for row in rows)
+                yield chunk if first else ',' + chunk
+            first = False
+        if mimetype == 'application/json':
+            yield ']'
+    finally:
+        # An abandoned download must not keep the read snapshot open
+        cursor.close()
+
+def export_response(cursor, names, name):
+    mimetype = export_format()
+    response = app.response_class(stream_with_context(export_chunks(cursor, names, mimetype)), mimetype=mimetype)
+    if mimetype == 'text/csv':
+        response.headers['Content-Disposition'] = f'attachment; filename={name}.csv'
+    response.vary.add('Accept')
+    return response
+
 # Routes
 @app.route('/login', methods=['POST'])
 def login():
@@ -216,82 +1334,553 @@ def login():
     db = get_db()
     cursor = db.cursor()
     
-    # Check in admins
-    cursor.execute("SELECT * FROM admins WHERE login = ?", (login,))
+    # Admins take precedence over coaches, coaches over students
+    cursor.execute(
+        "SELECT role, id, login, password, first_name, last_name FROM accounts WHERE login = ? ORDER BY priority LIMIT 1",
+        (login,)
+    )
     user = cursor.fetchone()
-    role = 'admin'
-    
-    if not user:
-        # Check in coaches
-        cursor.execute("SELECT * FROM coaches WHERE login = ?", (login,))
-        user = cursor.fetchone()
-        role = 'coach'
     
-    if not user:
-        # Check in students
-        cursor.execute("SELECT * FROM students WHERE login = ?", (login,))
-        user = cursor.fetchone()
-        role = 'student'
-    
-    if not user or not check_password_hash(user['password'], password):
+    if not user or not check_credentials(login, user['password'], password):
         return jsonify({'message': 'Invalid login or password!'}), 401
     
-    token = jwt.encode({
-        'id': user['id'],
-        'login': user['login'],
-        'role': role,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)
-    }, app.config['SECRET_KEY'], algorithm="HS256")
+    role = user['role']
+    
+    tokens = token_pair(cursor, user['id'], role)
+    db.commit()
     
     return jsonify({
-        'token': token,
+        **tokens,
         'role': role,
         'id': user['id'],
         'first_name': user['first_name'],
         'last_name': user['last_name']
     })
 
-# Helper function to save file
-def save_file(file, folder):
-    if not file:
-        return None
-    
-    filename = str(uuid.uuid4()) + os.path.splitext(file.filename)[1]
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], folder, filename)
-    file.save(filepath)
-    return os.path.join(folder, filename)
+# Exchange a refresh token for a new access token and a new refresh token. Each
+# refresh token works once; presenting a used one means it was copied, so the whole
+# family (that login's chain) is revoked.
+@app.route('/token/refresh', methods=['POST'])
+def refresh_token():
+    token = (request.json or {}).get('refresh_token')
+    if not token:
+        return jsonify({'message': 'Refresh token is missing!'}), 400
+    
+    db = get_db()
+    cursor = db.cursor()
+    token_hash = refresh_token_hash(token)
+    now = time.time()
+    
+    cursor.execute(
+        """UPDATE refresh_tokens SET used_at = ?
+        WHERE token_hash = ? AND used_at IS NULL AND expires_at > ?
+        RETURNING family, role, user_id""",
+        (now, token_hash, now)
+    )
+    current = cursor.fetchone()
+    
+    if not current:
+        cursor.execute("SELECT family, used_at FROM refresh_tokens WHERE token_hash = ?", (token_hash,))
+        known = cursor.fetchone()
+        if known and known['used_at'] is not None:
+            cursor.execute("DELETE FROM refresh_tokens WHERE family = ?", (known['family'],))
+            db.commit()
+            return jsonify({'message': 'Refresh token has been revoked!'}), 401
+        return jsonify({'message': 'Refresh token is invalid!'}), 401
+    
+    tokens = token_pair(cursor, current['user_id'], current['role'], current['family'])
+    db.commit()
+    
+    return jsonify(tokens)
+
+# Helper function to save file
+# Uploads are stored once under the SHA-256 of their content (blobs/ab/<digest><ext>)
+# and reference-counted in the blobs table, so identical files uploaded for several
+# records share one copy and one immutable URL. The folder argument only matters
+# for files uploaded before this scheme.
+BLOB_FOLDER = 'blobs'
+BLOB_CHUNK_SIZE = 64 * 1024
+
+def blob_path(digest, extension):
+    return f'{BLOB_FOLDER}/{digest[:2]}/{digest}{extension}'
+
+# A file part being received: written in chunks straight into the blob folder and
+# hashed on the way, so save_file only has to rename it. Files over the limit abort
+# the request with 413 as soon as they cross it.
+class UploadSpool:
+    def __init__(self, limit=None):
+        self.path = os.path.join(app.config['UPLOAD_FOLDER'], BLOB_FOLDER, f'.upload-{uuid.uuid4()}')
+        self.file = open(self.path, 'w+b')
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.limit = limit
+
+    def write(self, data):
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            raise RequestEntityTooLarge()
+        self.sha256.update(data)
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+BULK_IMPORT_ENDPOINTS = {'bulk_add_students', 'bulk_add_coaches'}
+
+class UploadRequest(Request):
+    # Plain form fields stay small; files are spooled to disk instead
+    max_form_memory_size = 1024 * 1024
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_spools = []
+
+    @property
+    def max_content_length(self):
+        if self.endpoint in BULK_IMPORT_ENDPOINTS:
+            return app.config['MAX_IMPORT_SIZE']
+        return app.config['MAX_CONTENT_LENGTH']
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        limit = None if self.endpoint in BULK_IMPORT_ENDPOINTS else app.config['MAX_FILE_SIZE']
+        if limit is not None and content_length is not None and content_length > limit:
+            raise RequestEntityTooLarge()
+        spool = UploadSpool(limit)
+        self.upload_spools.append(spool)
+        return spool
+
+app.request_class = UploadRequest
+
+@app.teardown_request
+def discard_upload_spools(exception):
+    # Parts that were received but not saved (failed validation, errors, CSV imports)
+    for spool in request.upload_spools:
+        spool.discard()
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    return jsonify({'message': 'File is too large!'}), 413
+
+def save_file(file, folder):
+    if not file:
+        return None
+
+    spool = file.stream
+    if not isinstance(spool, UploadSpool):
+        spool = UploadSpool()
+        shutil.copyfileobj(file.stream, spool, BLOB_CHUNK_SIZE)
+    spool.file.close()
+    try:
+        digest = spool.sha256.hexdigest()
+        image_path = blob_path(digest, os.path.splitext(file.filename)[1].lower())
+        # Taking the write lock here orders us against a delete_file job for the same blob
+        refcount = get_db().execute(
+            """INSERT INTO blobs (path, digest, size, refcount) VALUES (?, ?, ?, 1)
+            ON CONFLICT(path) DO UPDATE SET refcount = refcount + 1
+            RETURNING refcount""",
+            (image_path, digest, spool.size)
+        ).fetchone()['refcount']
+
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], image_path)
+        if not os.path.exists(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            os.replace(spool.path, filepath)
+            g.setdefault('new_blobs', []).append(image_path)
+    finally:
+        spool.discard()
+
+    if refcount == 1:
+        schedule_image_processing(image_path)
+        schedule_precompression(image_path)
+    return image_path
+
+@app.teardown_request
+def release_uncommitted_blobs(exception):
+    # A blob file moved into place by a request that then rolled back (or never
+    # committed) has no row; queue its delete, which rechecks under the write lock in
+    # case another upload of the same content has claimed it meanwhile
+    paths = g.pop('new_blobs', [])
+    if not paths:
+        return
+    db = get_db()
+    if db.in_transaction:
+        db.rollback()
+    cursor = db.cursor()
+    for path in paths:
+        if not cursor.execute("SELECT 1 FROM blobs WHERE path = ?", (path,)).fetchone():
+            enqueue_job(cursor, 'delete_file', {'path': path, 'blob': path}, f'delete_file:{path}')
+    db.commit()
+
+def is_blob(path):
+    return bool(path) and path.startswith(BLOB_FOLDER + '/')
+
+# Image variants
+# Every uploaded image gets resized WebP copies (metadata stripped) generated in the
+# background; list endpoints advertise them as srcset strings once they exist.
+IMAGE_VARIANTS = [('thumb', 320), ('medium', 800), ('large', 1600)]
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff'}
+IMAGE_QUALITY = 80
+
+# Which collection's cached responses show images from each upload folder; a blob
+# may be shared by all of them
+UPLOAD_COLLECTIONS = {'news': 'news', 'sliders': 'sliders', 'sports': 'sport_types', 'results': 'results'}
+
+def schedule_image_processing(image_path):
+    if Image is None or os.path.splitext(image_path)[1].lower() not in IMAGE_EXTENSIONS:
+        return
+    # Joins the current request's transaction, so the job exists only if the upload is committed
+    enqueue_job(get_db().cursor(), 'process_image', {'path': image_path}, f'process_image:{image_path}')
+
+def process_image(image_path):
+    source = os.path.join(app.config['UPLOAD_FOLDER'], image_path)
+    stem = os.path.splitext(image_path)[0]
+    variants = []
+
+    try:
+        with Image.open(source) as original:
+            original = ImageOps.exif_transpose(original)
+            if original.mode not in ('RGB', 'RGBA'):
+                original = original.convert('RGBA' if 'A' in original.getbands() else 'RGB')
+
+            previous_width = None
+            for variant, max_width in IMAGE_VARIANTS:
+                width = min(max_width, original.width)
+                if width == previous_width:
+                    break
+                previous_width = width
+
+                resized = original.copy()
+                resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+                path = f'{stem}_{variant}.webp'
+                # Saving without exif/icc arguments drops the camera metadata
+                resized.save(os.path.join(app.config['UPLOAD_FOLDER'], path), 'WEBP', quality=IMAGE_QUALITY, method=4)
+                variants.append((image_path, variant, path, resized.width, resized.height))
+    except Image.DecompressionBombError as e:
+        # Too many pixels to decode safely; that won't change on a retry
+        app.logger.warning("Skipping oversized image %s: %s", image_path, e)
+        return
+    except (OSError, ValueError) as e:
+        app.logger.warning("Could not process image %s: %s", image_path, e)
+        return
+
+    db = connect_db()
+    try:
+        # The owning record may have been deleted while we were resizing
+        if not os.path.exists(source):
+            for _, _, path, _, _ in variants:
+                remove_upload_file(path)
+            return
+        cursor = db.cursor()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO image_variants (image_path, variant, path, width, height) VALUES (?, ?, ?, ?, ?)",
+            variants
+        )
+        if is_blob(image_path):
+            bump_versions(cursor, *sorted(set(UPLOAD_COLLECTIONS.values())))
+        elif image_path.split('/')[0] in UPLOAD_COLLECTIONS:
+            bump_versions(cursor, UPLOAD_COLLECTIONS[image_path.split('/')[0]])
+        db.commit()
+    finally:
+        db.close()
+
+# Compressible uploads also get .gz (and .br) copies, so /uploads can serve them
+# compressed without compressing on every request
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+COMPRESSIBLE_EXTENSIONS = {'.svg', '.txt', '.csv', '.json', '.xml', '.html', '.css', '.js', '.bmp', '.tiff'}
+
+def schedule_precompression(path):
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return
+    enqueue_job(get_db().cursor(), 'precompress', {'path': path}, f'precompress:{path}')
+
+def precompress_file(path):
+    source = os.path.join(app.config['UPLOAD_FOLDER'], path)
+    if not os.path.exists(source):
+        return
+    with open(source, 'rb') as f:
+        data = f.read()
+
+    compressors = {'.gz': lambda body: gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors['.br'] = lambda body: brotli.compress(body, quality=11)
+    for suffix, compress in compressors.items():
+        body = compress(data)
+        # Not worth a second request path if it barely shrinks
+        if len(body) > len(data) * 0.9:
+            continue
+        temp_path = f'{source}{suffix}.tmp'
+        with open(temp_path, 'wb') as out:
+            out.write(body)
+        os.replace(temp_path, source + suffix)
+
+    # The upload may have been deleted while we were compressing
+    if not os.path.exists(source):
+        remove_upload_file(path)
+
+def load_image_srcsets(cursor, image_paths):
+    image_paths = [path for path in set(image_paths) if path]
+    if not image_paths:
+        return {}
+
+    placeholders = ', '.join('?' * len(image_paths))
+    cursor.execute(
+        f"SELECT image_path, path, width FROM image_variants WHERE image_path IN ({placeholders}) ORDER BY image_path, width",
+        image_paths
+    )
+    srcsets = {}
+    for row in cursor.fetchall():
+        srcsets.setdefault(row['image_path'], []).append(f"/uploads/{row['path']} {row['width']}w")
+    return {path: ', '.join(entries) for path, entries in srcsets.items()}
+
+def remove_upload_file(path):
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], path)
+    for candidate in [filepath] + [filepath + suffix for _, suffix in PRECOMPRESSED_ENCODINGS]:
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+# Drop one reference to an upload; the last one removes it together with its
+# generated variants. The files are deleted by the job queue once the surrounding
+# transaction commits, so a crash can't leave rows pointing at missing files or
+# files no row points at.
+def delete_upload(cursor, image_path):
+    if not image_path:
+        return
+    if is_blob(image_path):
+        blob = cursor.execute(
+            "UPDATE blobs SET refcount = refcount - 1 WHERE path = ? RETURNING refcount",
+            (image_path,)
+        ).fetchone()
+        if blob is not None and blob['refcount'] > 0:
+            return
+        cursor.execute("DELETE FROM blobs WHERE path = ?", (image_path,))
+
+    cursor.execute("SELECT path FROM image_variants WHERE image_path = ?", (image_path,))
+    variant_paths = [row['path'] for row in cursor.fetchall()]
+    cursor.execute("DELETE FROM image_variants WHERE image_path = ?", (image_path,))
+    cursor.execute(
+        "DELETE FROM jobs WHERE idempotency_key IN (?, ?) AND status = 'queued'",
+        (f'process_image:{image_path}', f'precompress:{image_path}')
+    )
+    for path in [image_path] + variant_paths:
+        enqueue_job(cursor, 'delete_file', {'path': path, 'blob': image_path}, f'delete_file:{path}')
+
+# Background jobs
+# A durable queue in the jobs table, worked by a few threads in every process.
+# Jobs are claimed atomically, retried with exponential backoff and must be
+# idempotent: a job may run again if its worker dies mid-way.
+JOB_WORKERS = 2
+JOB_POLL_INTERVAL = 1.0
+JOB_MAX_ATTEMPTS = 5
+JOB_LOCK_TIMEOUT = 300
+JOB_RETENTION = 7 * 24 * 3600
+
+job_lock = threading.Lock()
+job_state = {'pid': None, 'wakeup': None}
+
+def enqueue_job(cursor, kind, payload, idempotency_key=None):
+    # A key that is already queued or running is not enqueued twice; a finished one is re-armed
+    cursor.execute(
+        """INSERT INTO jobs (kind, payload, idempotency_key, max_attempts, run_after)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(idempotency_key) DO UPDATE SET
+            status = 'queued', attempts = 0, last_error = NULL, run_after = excluded.run_after,
+            payload = excluded.payload, finished_at = NULL
+        WHERE status IN ('done', 'failed')""",
+        (kind, json.dumps(payload), idempotency_key, JOB_MAX_ATTEMPTS, time.time())
+    )
+    if job_state['wakeup'] is not None:
+        job_state['wakeup'].set()
+
+def job_delete_file(payload):
+    if not is_blob(payload.get('blob')):
+        remove_upload_file(payload['path'])
+        return
+    # The same content may have been uploaded again since the job was queued. Holding
+    # the write lock keeps save_file from reviving the blob between check and delete.
+    db = connect_db()
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        if not db.execute("SELECT 1 FROM blobs WHERE path = ?", (payload['blob'],)).fetchone():
+            remove_upload_file(payload['path'])
+        db.rollback()
+    finally:
+        db.close()
+
+def job_process_image(payload):
+    process_image(payload['path'])
+
+def job_precompress(payload):
+    precompress_file(payload['path'])
+
+JOB_HANDLERS = {
+    'delete_file': job_delete_file,
+    'process_image': job_process_image,
+    'precompress': job_precompress
+}
+
+def job_housekeeping(db):
+    # Requeue jobs whose worker disappeared, and forget old finished ones
+    db.execute(
+        "UPDATE jobs SET status = 'queued', locked_by = NULL WHERE status = 'running' AND locked_at < ?",
+        (time.time() - JOB_LOCK_TIMEOUT,)
+    )
+    db.execute(
+        "DELETE FROM jobs WHERE status = 'done' AND finished_at < datetime('now', ?)",
+        (f'-{JOB_RETENTION} seconds',)
+    )
+    # Expired refresh tokens ride along with the job queue's housekeeping
+    db.execute("DELETE FROM refresh_tokens WHERE expires_at < ?", (time.time(),))
+    db.commit()
+
+def claim_job(db, worker_id):
+    now = time.time()
+    with job_lock:
+        due = now - job_state.get('housekeeping_at', 0) > 60
+        if due:
+            job_state['housekeeping_at'] = now
+    if due:
+        job_housekeeping(db)
+
+    # Cheap read first, so idle workers never take the write lock
+    if not db.execute("SELECT 1 FROM jobs WHERE status = 'queued' AND run_after <= ? LIMIT 1", (now,)).fetchone():
+        return None
+
+    job = db.execute(
+        """UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = ?, locked_at = ?
+        WHERE id = (
+            SELECT id FROM jobs WHERE status = 'queued' AND run_after <= ? ORDER BY run_after, id LIMIT 1
+        )
+        RETURNING id, kind, payload, attempts, max_attempts""",
+        (worker_id, now, now)
+    ).fetchone()
+    db.commit()
+    return job
+
+def run_job(db, job):
+    try:
+        handler = JOB_HANDLERS.get(job['kind'])
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job['kind']}")
+        handler(json.loads(job['payload']))
+    except Exception as e:
+        app.logger.warning("Job %s (%s) failed: %s", job['id'], job['kind'], e)
+        if job['attempts'] >= job['max_attempts']:
+            db.execute(
+                "UPDATE jobs SET status = 'failed', last_error = ?, locked_by = NULL, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (str(e), job['id'])
+            )
+        else:
+            db.execute(
+                "UPDATE jobs SET status = 'queued', last_error = ?, locked_by = NULL, run_after = ? WHERE id = ?",
+                (str(e), time.time() + 2 ** job['attempts'], job['id'])
+            )
+    else:
+        db.execute(
+            "UPDATE jobs SET status = 'done', last_error = NULL, locked_by = NULL, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (job['id'],)
+        )
+    db.commit()
+
+def work_jobs(worker_id, wakeup=None):
+    # With no wakeup event, drain what is runnable now and return (used by `flask jobs run`)
+    db = connect_db()
+    try:
+        while True:
+            try:
+                job = claim_job(db, worker_id)
+            except sqlite3.OperationalError as e:
+                app.logger.warning("Job worker %s could not claim a job: %s", worker_id, e)
+                db.rollback()
+                job = None
+            if job is not None:
+                try:
+                    run_job(db, job)
+                except sqlite3.OperationalError as e:
+                    # The job stays 'running' and is requeued by housekeeping after JOB_LOCK_TIMEOUT
+                    app.logger.warning("Job worker %s could not record job %s: %s", worker_id, job['id'], e)
+                    db.rollback()
+                continue
+            if wakeup is None:
+                return
+            wakeup.wait(JOB_POLL_INTERVAL)
+            wakeup.clear()
+    finally:
+        db.close()
+
+def start_job_workers():
+    # Threads don't survive fork, so every worker process starts its own
+    with job_lock:
+        if job_state['pid'] == os.getpid():
+            return
+        job_state['pid'] = os.getpid()
+        job_state['wakeup'] = threading.Event()
+        for number in range(JOB_WORKERS):
+            worker_id = f'{os.getpid()}-{number}'
+            threading.Thread(
+                target=work_jobs, args=(worker_id, job_state['wakeup']), name=f'jobs-{worker_id}', daemon=True
+            ).start()
+
+@app.before_request
+def ensure_job_workers():
+    if job_state['pid'] != os.getpid():
+        start_job_workers()
+
+jobs_cli = AppGroup('jobs', help='Background job commands.')
+
+@jobs_cli.command('run')
+def run_jobs_command():
+    work_jobs(f'cli-{os.getpid()}')
+    click.echo("No runnable jobs left.")
+
+app.cli.add_command(jobs_cli)
 
 # Admin routes for student management
 @app.route('/students', methods=['GET'])
 @token_required
 @role_required(['admin'])
+@versioned('students')
 def get_students(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    search = request.args.get('search', '')
-    if search:
-        cursor.execute(
-            "SELECT * FROM students WHERE first_name LIKE ? OR last_name LIKE ? OR phone LIKE ? OR login LIKE ?",
-            (f'%{search}%', f'%{search}%', f'%{search}%', f'%{search}%')
-        )
-    else:
-        cursor.execute("SELECT * FROM students")
-    
-    students = cursor.fetchall()
-    result = []
-    
-    for student in students:
-        result.append({
-            'id': student['id'],
-            'first_name': student['first_name'],
-            'last_name': student['last_name'],
-            'phone': student['phone'],
-            'login': student['login'],
-            'created_at': student['created_at']
-        })
-    
-    return jsonify(result)
+    names, columns, error = select_fields(STUDENT_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, _ = get_page_args()
+    conditions, params = search_conditions(request.args.get('search', ''), 'students')
+
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+
+    cursor.execute(
+        f"SELECT {columns} FROM students{where_clause(conditions)} ORDER BY id LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+
+    students, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+    return page_response([project(student, names) for student in students], next_cursor)
+
+@app.route('/students/export', methods=['GET'])
+@token_required
+@role_required(['admin'])
+@versioned('students', vary_on=export_format)
+def export_students(current_user):
+    names, columns, error = select_fields(STUDENT_FIELDS, required=())
+    if error:
+        return jsonify({'message': error}), 400
+
+    conditions, params = search_conditions(request.args.get('search', ''), 'students')
+
+    cursor = get_db(readonly=True).cursor()
+    cursor.execute(f"SELECT {columns} FROM students{where_clause(conditions)} ORDER BY id", params)
+    return export_response(cursor, names, 'students')
 
 @app.route('/students', methods=['POST'])
 @token_required
@@ -304,13 +1893,14 @@ def add_student(current_user):
     
     db = get_db()
     cursor = db.cursor()
+    hashed_password = hash_password(data['password'])
     
     try:
-        hashed_password = generate_password_hash(data['password'])
         cursor.execute(
             "INSERT INTO students (first_name, last_name, phone, login, password) VALUES (?, ?, ?, ?, ?)",
             (data['first_name'], data['last_name'], data.get('phone', ''), data['login'], hashed_password)
         )
+        bump_versions(cursor, 'students')
         db.commit()
         
         return jsonify({'message': 'Student added successfully!', 'id': cursor.lastrowid})
@@ -330,6 +1920,7 @@ def update_student(current_user, student_id):
     
     db = get_db()
     cursor = db.cursor()
+    hashed_password = hash_password(data['password']) if 'password' in data else None
     
     try:
         update_fields = []
@@ -353,7 +1944,7 @@ def update_student(current_user, student_id):
         
         if 'password' in data:
             update_fields.append("password = ?")
-            params.append(generate_password_hash(data['password']))
+            params.append(hashed_password)
         
         if not update_fields:
             return jsonify({'message': 'No valid fields to update!'}), 400
@@ -363,11 +1954,14 @@ def update_student(current_user, student_id):
             f"UPDATE students SET {', '.join(update_fields)} WHERE id = ?", 
             params
         )
-        db.commit()
-        
         if cursor.rowcount == 0:
             return jsonify({'message': 'Student not found!'}), 404
         
+        if 'password' in data:
+            revoke_tokens(cursor, 'student', student_id)
+        bump_versions(cursor, 'students')
+        db.commit()
+        
         return jsonify({'message': 'Student updated successfully!'})
     except sqlite3.IntegrityError:
         return jsonify({'message': 'Login already exists!'}), 409
@@ -382,102 +1976,110 @@ def delete_student(current_user, student_id):
     cursor = db.cursor()
     
     cursor.execute("DELETE FROM students WHERE id = ?", (student_id,))
-    db.commit()
-    
     if cursor.rowcount == 0:
         return jsonify({'message': 'Student not found!'}), 404
     
+    revoke_tokens(cursor, 'student', student_id)
+    bump_versions(cursor, 'students')
+    db.commit()
+    
     return jsonify({'message': 'Student deleted successfully!'})
 
 # Admin & Coach routes for student viewing
 @app.route('/students/view', methods=['GET'])
 @token_required
 @role_required(['admin', 'coach'])
+@versioned('students')
 def view_students(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    search = request.args.get('search', '')
-    if search:
-        cursor.execute(
-            "SELECT id, first_name, last_name, phone FROM students WHERE first_name LIKE ? OR last_name LIKE ? OR phone LIKE ?",
-            (f'%{search}%', f'%{search}%', f'%{search}%')
-        )
-    else:
-        cursor.execute("SELECT id, first_name, last_name, phone FROM students")
-    
-    students = cursor.fetchall()
-    result = []
-    
-    for student in students:
-        result.append({
-            'id': student['id'],
-            'first_name': student['first_name'],
-            'last_name': student['last_name'],
-            'phone': student['phone']
-        })
-    
-    return jsonify(result)
+    names, columns, error = select_fields(STUDENT_VIEW_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, _ = get_page_args()
+    conditions, params = search_conditions(request.args.get('search', ''), 'students', columns=['first_name', 'last_name', 'phone'])
+
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+
+    cursor.execute(
+        f"SELECT {columns} FROM students{where_clause(conditions)} ORDER BY id LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+
+    students, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+    return page_response([project(student, names) for student in students], next_cursor)
 
 # Admin routes for coach management
 @app.route('/coaches', methods=['GET'])
 @token_required
 @role_required(['admin'])
+@versioned('coaches', 'sport_types')
 def get_coaches(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    search = request.args.get('search', '')
-    if search:
-        cursor.execute("""
-            SELECT c.*, s.name as sport_name FROM coaches c
-            LEFT JOIN sport_types s ON c.sport_type_id = s.id
-            WHERE c.first_name LIKE ? OR c.last_name LIKE ? OR c.phone LIKE ? OR c.login LIKE ? OR s.name LIKE ?
-        """, (f'%{search}%', f'%{search}%', f'%{search}%', f'%{search}%', f'%{search}%'))
-    else:
-        cursor.execute("""
-            SELECT c.*, s.name as sport_name FROM coaches c
-            LEFT JOIN sport_types s ON c.sport_type_id = s.id
-        """)
-    
-    coaches = cursor.fetchall()
-    result = []
-    
-    for coach in coaches:
-        result.append({
-            'id': coach['id'],
-            'first_name': coach['first_name'],
-            'last_name': coach['last_name'],
-            'birth_date': coach['birth_date'],
-            'phone': coach['phone'],
-            'sport_type_id': coach['sport_type_id'],
-            'sport_name': coach['sport_name'],
-            'login': coach['login'],
-            'created_at': coach['created_at']
-        })
-    
-    return jsonify(result)
+    names, columns, error = select_fields(COACH_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
 
-@app.route('/coaches', methods=['POST'])
+    limit, after_id, _ = get_page_args()
+    conditions, params = search_conditions(request.args.get('search', ''), 'coaches', prefix='c.')
+
+    if after_id is not None:
+        conditions.append("c.id > ?")
+        params.append(after_id)
+
+    cursor.execute(f"""
+        SELECT {columns} FROM coaches c
+        LEFT JOIN sport_types s ON c.sport_type_id = s.id
+        {where_clause(conditions)}
+        ORDER BY c.id LIMIT ?
+    """, params + [fetch_limit(limit)])
+
+    coaches, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+    return page_response([project(coach, names) for coach in coaches], next_cursor)
+
+@app.route('/coaches/export', methods=['GET'])
 @token_required
 @role_required(['admin'])
-def add_coach(current_user):
-    data = request.json
-    
+@versioned('coaches', 'sport_types', vary_on=export_format)
+def export_coaches(current_user):
+    names, columns, error = select_fields(COACH_FIELDS, required=())
+    if error:
+        return jsonify({'message': error}), 400
+
+    conditions, params = search_conditions(request.args.get('search', ''), 'coaches', prefix='c.')
+
+    cursor = get_db(readonly=True).cursor()
+    cursor.execute(f"""
+        SELECT {columns} FROM coaches c
+        LEFT JOIN sport_types s ON c.sport_type_id = s.id
+        {where_clause(conditions)}
+        ORDER BY c.id
+    """, params)
+    return export_response(cursor, names, 'coaches')
+
+def coach_name(data):
     # Ma'lumotlarni tekshirish
-    if 'full_name' in data:
+    if data.get('full_name'):
         # Agar full_name kelsa, uni first_name va last_name ga ajratamiz
         full_name = data['full_name'].split()
         if len(full_name) >= 2:
-            first_name = full_name[0]
-            last_name = ' '.join(full_name[1:])
-        else:
-            first_name = data['full_name']
-            last_name = ""
-    else:
-        first_name = data.get('first_name', '')
-        last_name = data.get('last_name', '')
+            return full_name[0], ' '.join(full_name[1:])
+        return data['full_name'], ""
+    return data.get('first_name', ''), data.get('last_name', '')
+
+@app.route('/coaches', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def add_coach(current_user):
+    data = request.json
     
+    first_name, last_name = coach_name(data)
     if not first_name:
         return jsonify({'message': 'Name is required!'}), 400
     
@@ -486,9 +2088,9 @@ def add_coach(current_user):
     
     db = get_db()
     cursor = db.cursor()
+    hashed_password = hash_password(password)
     
     try:
-        hashed_password = generate_password_hash(password)
         cursor.execute(
             """INSERT INTO coaches (first_name, last_name, birth_date, phone, sport_type_id, login, password) 
             VALUES (?, ?, ?, ?, ?, ?, ?)""",
@@ -502,6 +2104,7 @@ def add_coach(current_user):
                 hashed_password
             )
         )
+        bump_versions(cursor, 'coaches')
         db.commit()
         
         return jsonify({'message': 'Coach added successfully!', 'id': cursor.lastrowid})
@@ -521,6 +2124,7 @@ def update_coach(current_user, coach_id):
     
     db = get_db()
     cursor = db.cursor()
+    hashed_password = hash_password(data['password']) if 'password' in data else None
     
     try:
         update_fields = []
@@ -552,7 +2156,7 @@ def update_coach(current_user, coach_id):
         
         if 'password' in data:
             update_fields.append("password = ?")
-            params.append(generate_password_hash(data['password']))
+            params.append(hashed_password)
         
         if not update_fields:
             return jsonify({'message': 'No valid fields to update!'}), 400
@@ -562,11 +2166,16 @@ def update_coach(current_user, coach_id):
             f"UPDATE coaches SET {', '.join(update_fields)} WHERE id = ?", 
             params
         )
-        db.commit()
-        
         if cursor.rowcount == 0:
             return jsonify({'message': 'Coach not found!'}), 404
         
+        if 'password' in data:
+            revoke_tokens(cursor, 'coach', coach_id)
+        if 'first_name' in data or 'last_name' in data:
+            refresh_schedule_weeks_for(cursor, 'coach_id', coach_id)
+        bump_versions(cursor, 'coaches')
+        db.commit()
+        
         return jsonify({'message': 'Coach updated successfully!'})
     except sqlite3.IntegrityError:
         return jsonify({'message': 'Login already exists!'}), 409
@@ -581,63 +2190,248 @@ def delete_coach(current_user, coach_id):
     cursor = db.cursor()
     
     cursor.execute("DELETE FROM coaches WHERE id = ?", (coach_id,))
-    db.commit()
-    
     if cursor.rowcount == 0:
         return jsonify({'message': 'Coach not found!'}), 404
     
+    revoke_tokens(cursor, 'coach', coach_id)
+    refresh_schedule_weeks_for(cursor, 'coach_id', coach_id)
+    bump_versions(cursor, 'coaches')
+    db.commit()
+    
     return jsonify({'message': 'Coach deleted successfully!'})
 
+# Bulk import of students and coaches
+# Accepts a CSV or JSONL upload (multipart field "file" or the raw request body),
+# read row by row and written in batches of IMPORT_BATCH_SIZE, one transaction each.
+IMPORT_BATCH_SIZE = 1000
+
+def iter_import_rows():
+    upload = request.files.get('file')
+    if upload:
+        stream, filename, mimetype = upload.stream, upload.filename or '', upload.mimetype
+    else:
+        stream, filename, mimetype = request.stream, '', request.mimetype
+
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if mimetype in ('text/csv', 'application/csv') or filename.lower().endswith('.csv'):
+        # Row numbers count the header line as row 1, like a spreadsheet
+        for row_number, row in enumerate(csv.DictReader(text), start=2):
+            yield row_number, {key: value for key, value in row.items() if key and value != ''}
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row_number, row if isinstance(row, dict) else None
+
+def import_batch(db, table, columns, batch, errors, seen_logins):
+    cursor = db.cursor()
+
+    # Logins that already exist are reported instead of aborting the whole batch
+    logins = [record['login'] for _, record, _ in batch]
+    placeholders = ', '.join('?' * len(logins))
+    cursor.execute(f"SELECT login FROM {table} WHERE login IN ({placeholders})", logins)
+    existing = {row['login'] for row in cursor.fetchall()}
+
+    rows = []
+    for row_number, record, password in batch:
+        if record['login'] in existing or record['login'] in seen_logins:
+            errors.append({'row': row_number, 'login': record['login'], 'message': 'Login already exists!'})
+            continue
+        seen_logins.add(record['login'])
+        rows.append((row_number, record, password))
+
+    if not rows:
+        return 0
+
+    hashed = hash_passwords([password for _, _, password in rows])
+    # Another request may take a login between the check above and this insert;
+    # those rows are skipped here and reported like the others
+    row_values = f"({', '.join('?' * (len(columns) + 1))})"
+    cursor.execute(
+        f"""INSERT INTO {table} ({', '.join(columns)}, password) VALUES {', '.join([row_values] * len(rows))}
+        ON CONFLICT(login) DO NOTHING RETURNING login""",
+        [value for (_, record, _), hashed_password in zip(rows, hashed)
+         for value in [record.get(column) for column in columns] + [hashed_password]]
+    )
+    inserted = {row['login'] for row in cursor.fetchall()}
+    for row_number, record, _ in rows:
+        if record['login'] not in inserted:
+            errors.append({'row': row_number, 'login': record['login'], 'message': 'Login already exists!'})
+
+    if inserted:
+        bump_versions(cursor, table)
+    db.commit()
+    return len(inserted)
+
+def bulk_import(table, columns, prepare_row):
+    db = get_db()
+    imported = 0
+    errors = []
+    seen_logins = set()
+    batch = []
+
+    try:
+        for row_number, row in iter_import_rows():
+            if row is None:
+                errors.append({'row': row_number, 'message': 'Invalid row!'})
+                continue
+            try:
+                record, password = prepare_row(row)
+            except ValueError as e:
+                errors.append({'row': row_number, 'login': row.get('login'), 'message': str(e)})
+                continue
+
+            batch.append((row_number, record, password))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += import_batch(db, table, columns, batch, errors, seen_logins)
+                batch = []
+
+        if batch:
+            imported += import_batch(db, table, columns, batch, errors, seen_logins)
+    except UnicodeDecodeError:
+        db.rollback()
+        return jsonify({'message': 'File must be UTF-8 encoded!', 'imported': imported, 'errors': errors}), 400
+    except HashingBusy:
+        # Earlier batches are committed; report them and where to resume
+        db.rollback()
+        response = jsonify({
+            'message': 'Server is busy, the import stopped early!',
+            'imported': imported,
+            'failed': len(errors),
+            'errors': errors,
+            'resume_row': batch[0][0]
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    return jsonify({'imported': imported, 'failed': len(errors), 'errors': errors})
+
+def check_text_fields(row, keys):
+    # JSONL values may be any JSON type; these columns take strings (or null) only
+    for key in keys:
+        if row.get(key) is not None and not isinstance(row[key], str):
+            raise ValueError(f'Invalid {key}!')
+
+def prepare_student_row(row):
+    check_text_fields(row, ('first_name', 'last_name', 'phone', 'login', 'password'))
+    if not row.get('first_name') or not row.get('last_name') or not row.get('login') or not row.get('password'):
+        raise ValueError('Required fields are missing!')
+    record = {
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'phone': row.get('phone', ''),
+        'login': row['login']
+    }
+    return record, row['password']
+
+def prepare_coach_row(row):
+    check_text_fields(row, ('full_name', 'first_name', 'last_name', 'birth_date', 'phone', 'login', 'password'))
+    first_name, last_name = coach_name(row)
+    if not first_name:
+        raise ValueError('Name is required!')
+    last_name = last_name or ''
+
+    sport_type_id = row.get('sport_type_id')
+    if sport_type_id is not None:
+        try:
+            sport_type_id = int(sport_type_id)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid sport_type_id!')
+
+    record = {
+        'first_name': first_name,
+        'last_name': last_name,
+        'birth_date': row.get('birth_date', ''),
+        'phone': row.get('phone', ''),
+        'sport_type_id': sport_type_id,
+        'login': row.get('login') or first_name.lower() + last_name.lower()
+    }
+    return record, row.get('password') or 'default123'
+
+@app.route('/students/bulk', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def bulk_add_students(current_user):
+    return bulk_import('students', ['first_name', 'last_name', 'phone', 'login'], prepare_student_row)
+
+@app.route('/coaches/bulk', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def bulk_add_coaches(current_user):
+    return bulk_import(
+        'coaches',
+        ['first_name', 'last_name', 'birth_date', 'phone', 'sport_type_id', 'login'],
+        prepare_coach_row
+    )
+
 # Coach viewing route for students
 @app.route('/coaches/view', methods=['GET'])
 @token_required
+@versioned('coaches', 'sport_types')
 def view_coaches(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    cursor.execute("""
-        SELECT c.id, c.first_name, c.last_name, c.birth_date, c.phone, s.name as sport_name 
+    names, columns, error = select_fields(COACH_VIEW_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, _ = get_page_args()
+    conditions = []
+    params = []
+
+    if after_id is not None:
+        conditions.append("c.id > ?")
+        params.append(after_id)
+
+    cursor.execute(f"""
+        SELECT {columns}
         FROM coaches c
         LEFT JOIN sport_types s ON c.sport_type_id = s.id
-    """)
-    
-    coaches = cursor.fetchall()
-    result = []
-    
-    for coach in coaches:
-        result.append({
-            'id': coach['id'],
-            'first_name': coach['first_name'],
-            'last_name': coach['last_name'],
-            'birth_date': coach['birth_date'],
-            'phone': coach['phone'],
-            'sport_name': coach['sport_name']
-        })
-    
-    return jsonify(result)
+        {where_clause(conditions)}
+        ORDER BY c.id LIMIT ?
+    """, params + [fetch_limit(limit)])
+
+    coaches, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+    return page_response([project(coach, names) for coach in coaches], next_cursor)
 
 # Admin routes for slider management
 @app.route('/sliders', methods=['GET'])
 @token_required
+@versioned('sliders')
 def get_sliders(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    cursor.execute("SELECT * FROM sliders")
-    
-    sliders = cursor.fetchall()
-    result = []
-    
-    for slider in sliders:
-        result.append({
-            'id': slider['id'],
-            'school_name': slider['school_name'],
-            'image_path': slider['image_path'],
-            'description': slider['description'],
-            'created_at': slider['created_at']
-        })
-    
-    return jsonify(result)
+    names, columns, error = select_fields(SLIDER_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, _ = get_page_args()
+    conditions = []
+    params = []
+
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+
+    cursor.execute(
+        f"SELECT {columns} FROM sliders{where_clause(conditions)} ORDER BY id LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+
+    sliders, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+    srcsets = {}
+    if 'image_srcset' in names:
+        srcsets = load_image_srcsets(cursor, [slider['image_path'] for slider in sliders])
+
+    derived = {'image_srcset': lambda row: srcsets.get(row['image_path'])}
+    return page_response([project(slider, names, derived) for slider in sliders], next_cursor)
 
 @app.route('/sliders', methods=['POST'])
 @token_required
@@ -662,6 +2456,7 @@ def add_slider(current_user):
         "INSERT INTO sliders (school_name, image_path, description) VALUES (?, ?, ?)",
         (school_name, image_path, description)
     )
+    bump_versions(cursor, 'sliders')
     db.commit()
     
     return jsonify({'message': 'Slider added successfully!', 'id': cursor.lastrowid})
@@ -685,8 +2480,7 @@ def update_slider(current_user, slider_id):
     
     if 'image' in request.files and request.files['image'].filename:
         # Delete old image if exists
-        if image_path and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], image_path)):
-            os.remove(os.path.join(app.config['UPLOAD_FOLDER'], image_path))
+        delete_upload(cursor, image_path)
         
         # Save new image
         image_path = save_file(request.files['image'], 'sliders')
@@ -695,6 +2489,7 @@ def update_slider(current_user, slider_id):
         "UPDATE sliders SET school_name = ?, image_path = ?, description = ? WHERE id = ?",
         (school_name, image_path, description, slider_id)
     )
+    bump_versions(cursor, 'sliders')
     db.commit()
     
     return jsonify({'message': 'Slider updated successfully!'})
@@ -713,40 +2508,65 @@ def delete_slider(current_user, slider_id):
         return jsonify({'message': 'Slider not found!'}), 404
     
     # Delete image file if exists
-    if slider['image_path'] and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], slider['image_path'])):
-        os.remove(os.path.join(app.config['UPLOAD_FOLDER'], slider['image_path']))
+    delete_upload(cursor, slider['image_path'])
     
     cursor.execute("DELETE FROM sliders WHERE id = ?", (slider_id,))
+    bump_versions(cursor, 'sliders')
     db.commit()
     
     return jsonify({'message': 'Slider deleted successfully!'})
 
+# Load images for a whole page of news in one query instead of one per article
+def load_news_images(cursor, news_ids):
+    images_by_news = {}
+    if not news_ids:
+        return images_by_news
+
+    placeholders = ', '.join('?' * len(news_ids))
+    cursor.execute(
+        f"SELECT news_id, image_path FROM news_images WHERE news_id IN ({placeholders}) ORDER BY news_id, id",
+        news_ids
+    )
+    for img in cursor.fetchall():
+        images_by_news.setdefault(img['news_id'], []).append(img['image_path'])
+
+    return images_by_news
+
 # Admin routes for news management
 @app.route('/news', methods=['GET'])
 @token_required
+@versioned('news')
 def get_news(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    cursor.execute("SELECT * FROM news ORDER BY date DESC")
-    news_items = cursor.fetchall()
-    result = []
-    
-    for news in news_items:
-        cursor.execute("SELECT image_path FROM news_images WHERE news_id = ?", (news['id'],))
-        images = cursor.fetchall()
-        image_paths = [img['image_path'] for img in images]
-        
-        result.append({
-            'id': news['id'],
-            'title': news['title'],
-            'content': news['content'],
-            'date': news['date'],
-            'created_at': news['created_at'],
-            'images': image_paths
-        })
-    
-    return jsonify(result)
+    # ?summary=1 swaps the full body for an excerpt
+    default = NEWS_SUMMARY_FIELDS if request.args.get('summary') in ('1', 'true') else NEWS_DEFAULT_FIELDS
+    names, columns, error = select_fields(NEWS_FIELDS, default, required=('id', 'date'))
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, after_date = get_page_args()
+    conditions, params = date_desc_conditions(after_date, after_id)
+
+    cursor.execute(
+        f"SELECT {columns} FROM news{where_clause(conditions)} ORDER BY IFNULL(date, '') DESC, id DESC LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+    news_items, next_cursor = paginate(cursor.fetchall(), limit, date_desc_cursor)
+    
+    images_by_news = {}
+    srcsets = {}
+    if 'images' in names or 'images_srcset' in names:
+        images_by_news = load_news_images(cursor, [news['id'] for news in news_items])
+    if 'images_srcset' in names:
+        srcsets = load_image_srcsets(cursor, [path for paths in images_by_news.values() for path in paths])
+
+    derived = {
+        'images': lambda row: images_by_news.get(row['id'], []),
+        'images_srcset': lambda row: [srcsets.get(path) for path in images_by_news.get(row['id'], [])]
+    }
+    return page_response([project(news, names, derived) for news in news_items], next_cursor)
 
 @app.route('/news', methods=['POST'])
 @token_required
@@ -779,6 +2599,7 @@ def add_news(current_user):
                     (news_id, image_path)
                 )
     
+    bump_versions(cursor, 'news')
     db.commit()
     
     return jsonify({'message': 'News added successfully!', 'id': news_id})
@@ -812,8 +2633,7 @@ def update_news(current_user, news_id):
         old_images = cursor.fetchall()
         
         for img in old_images:
-            if img['image_path'] and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], img['image_path'])):
-                os.remove(os.path.join(app.config['UPLOAD_FOLDER'], img['image_path']))
+            delete_upload(cursor, img['image_path'])
         
         cursor.execute("DELETE FROM news_images WHERE news_id = ?", (news_id,))
         
@@ -837,6 +2657,7 @@ def update_news(current_user, news_id):
                     (news_id, image_path)
                 )
     
+    bump_versions(cursor, 'news')
     db.commit()
     
     return jsonify({'message': 'News updated successfully!'})
@@ -853,11 +2674,11 @@ def delete_news(current_user, news_id):
     images = cursor.fetchall()
     
     for img in images:
-        if img['image_path'] and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], img['image_path'])):
-            os.remove(os.path.join(app.config['UPLOAD_FOLDER'], img['image_path']))
+        delete_upload(cursor, img['image_path'])
     
     cursor.execute("DELETE FROM news_images WHERE news_id = ?", (news_id,))
     cursor.execute("DELETE FROM news WHERE id = ?", (news_id,))
+    bump_versions(cursor, 'news')
     db.commit()
     
     if cursor.rowcount == 0:
@@ -868,25 +2689,35 @@ def delete_news(current_user, news_id):
 # Admin routes for sport types management
 @app.route('/sport-types', methods=['GET'])
 @token_required
+@versioned('sport_types')
 def get_sport_types(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    cursor.execute("SELECT * FROM sport_types")
-    
-    sports = cursor.fetchall()
-    result = []
-    
-    for sport in sports:
-        result.append({
-            'id': sport['id'],
-            'name': sport['name'],
-            'description': sport['description'],
-            'image_path': sport['image_path'],
-            'created_at': sport['created_at']
-        })
-    
-    return jsonify(result)
+    names, columns, error = select_fields(SPORT_TYPE_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, _ = get_page_args()
+    conditions = []
+    params = []
+
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+
+    cursor.execute(
+        f"SELECT {columns} FROM sport_types{where_clause(conditions)} ORDER BY id LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+
+    sports, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+    srcsets = {}
+    if 'image_srcset' in names:
+        srcsets = load_image_srcsets(cursor, [sport['image_path'] for sport in sports])
+
+    derived = {'image_srcset': lambda row: srcsets.get(row['image_path'])}
+    return page_response([project(sport, names, derived) for sport in sports], next_cursor)
 
 @app.route('/sport-types', methods=['POST'])
 @token_required
@@ -909,6 +2740,7 @@ def add_sport_type(current_user):
         "INSERT INTO sport_types (name, description, image_path) VALUES (?, ?, ?)",
         (name, description, image_path)
     )
+    bump_versions(cursor, 'sport_types')
     db.commit()
     
     return jsonify({'message': 'Sport type added successfully!', 'id': cursor.lastrowid})
@@ -932,74 +2764,461 @@ def update_sport_type(current_user, sport_id):
     
     if 'image' in request.files and request.files['image'].filename:
         # Delete old image if exists
-        if image_path and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], image_path)):
-            os.remove(os.path.join(app.config['UPLOAD_FOLDER'], image_path))
+        delete_upload(cursor, image_path)
         
         # Save new image
         image_path = save_file(request.files['image'], 'sports')
     
     cursor.execute(
-        "UPDATE sport_types SET name = ?, description = ?, image_path = ? WHERE id = ?",
-        (name, description, image_path, sport_id)
+        "UPDATE sport_types SET name = ?, description = ?, image_path = ? WHERE id = ?",
+        (name, description, image_path, sport_id)
+    )
+    if name != sport['name']:
+        refresh_schedule_weeks_for(cursor, 'sport_type_id', sport_id)
+    bump_versions(cursor, 'sport_types')
+    db.commit()
+    
+    return jsonify({'message': 'Sport type updated successfully!'})
+
+@app.route('/sport-types/<int:sport_id>', methods=['DELETE'])
+@token_required
+@role_required(['admin'])
+def delete_sport_type(current_user, sport_id):
+    db = get_db()
+    cursor = db.cursor()
+    
+    cursor.execute("SELECT image_path FROM sport_types WHERE id = ?", (sport_id,))
+    sport = cursor.fetchone()
+    
+    if not sport:
+        return jsonify({'message': 'Sport type not found!'}), 404
+    
+    # Delete image file if exists
+    delete_upload(cursor, sport['image_path'])
+    
+    cursor.execute("DELETE FROM sport_types WHERE id = ?", (sport_id,))
+    refresh_schedule_weeks_for(cursor, 'sport_type_id', sport_id)
+    bump_versions(cursor, 'sport_types')
+    db.commit()
+    
+    return jsonify({'message': 'Sport type deleted successfully!'})
+
+# Schedule engine
+# Dates are ISO strings, so calendar ranges are plain string ranges on the
+# (date, time), (coach_id, date, time) and (sport_type_id, date, time) indexes.
+# Recurring sessions are stored once as a weekly rule in training_series and
+# expanded only over the window being read; a cancelled occurrence is a row in
+# training_series_exceptions and a changed one is a training_schedule row with
+# series_id / occurrence_date, which hides the generated occurrence.
+# Weeks (Monday to Sunday) are also kept precomputed in schedule_weeks as the list
+# the week endpoint returns; writes that change a stored week's sessions, or the
+# coach and sport names shown in them, rebuild it. Weeks not stored are expanded
+# on read.
+SCHEDULE_SELECT = """
+    SELECT ts.*, c.first_name as coach_first_name, c.last_name as coach_last_name, st.name as sport_name
+    FROM training_schedule ts
+    LEFT JOIN coaches c ON ts.coach_id = c.id
+    LEFT JOIN sport_types st ON ts.sport_type_id = st.id
+"""
+
+SERIES_SELECT = """
+    SELECT s.*, c.first_name as coach_first_name, c.last_name as coach_last_name, st.name as sport_name
+    FROM training_series s
+    LEFT JOIN coaches c ON s.coach_id = c.id
+    LEFT JOIN sport_types st ON s.sport_type_id = st.id
+"""
+
+# Longest window /training-schedule/occurrences expands at once
+MAX_SCHEDULE_WINDOW = 366
+DEFAULT_SESSION_MINUTES = 60
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def week_start(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+def parse_time(value):
+    # 'H:MM' or 'HH:MM' -> minutes after midnight
+    try:
+        hours, minutes = str(value).split(':')[:2]
+        hours, minutes = int(hours), int(minutes)
+    except (TypeError, ValueError):
+        return None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return None
+    return hours * 60 + minutes
+
+def format_time(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+def schedule_values(data, current=None):
+    # Validated session columns from a request body, applied on top of an existing
+    # session. Times are stored zero-padded, so they sort correctly as text.
+    # Returns (values, error message).
+    values = {key: current[key] for key in ('date', 'time', 'duration', 'sport_type_id', 'coach_id', 'room')} if current else {
+        'duration': DEFAULT_SESSION_MINUTES, 'sport_type_id': None, 'coach_id': None, 'room': ''
+    }
+    for key in ('date', 'time', 'duration', 'sport_type_id', 'coach_id', 'room'):
+        if key in data:
+            values[key] = data[key]
+
+    if not values.get('date') or not values.get('time'):
+        return None, 'Date and time are required!'
+    if (current is None or 'date' in data) and parse_date(values['date']) is None:
+        return None, 'Dates must be in YYYY-MM-DD format!'
+    start = parse_time(values['time'])
+    if start is None and (current is None or 'time' in data):
+        return None, 'Time must be in HH:MM format!'
+    if start is not None:
+        values['time'] = format_time(start)
+        duration = values['duration']
+        if not isinstance(duration, int) or duration < 1 or start + duration > 24 * 60:
+            return None, 'Duration must be a number of minutes within the day!'
+    return values, None
+
+def schedule_item(schedule):
+    return {
+        'id': schedule['id'],
+        'date': schedule['date'],
+        'time': schedule['time'],
+        'sport_type_id': schedule['sport_type_id'],
+        'sport_name': schedule['sport_name'],
+        'coach_id': schedule['coach_id'],
+        'coach_name': f"{schedule['coach_first_name']} {schedule['coach_last_name']}",
+        'room': schedule['room'],
+        'duration': schedule['duration'],
+        'series_id': schedule['series_id'],
+        'occurrence_date': schedule['occurrence_date'],
+        'created_at': schedule['created_at']
+    }
+
+# Schedule items are built in Python (coach_name) and the range listing merges in
+# generated occurrences, so ?fields= trims the response rather than the query
+SCHEDULE_FIELDS = (
+    'id', 'date', 'time', 'sport_type_id', 'sport_name', 'coach_id', 'coach_name', 'room', 'duration',
+    'series_id', 'occurrence_date', 'created_at'
+)
+
+def series_occurrences(series, start, end):
+    # Dates of a weekly series that fall inside [start, end], in order
+    first_day = parse_date(series['start_date'])
+    first = max(start, first_day)
+    last = min(end, parse_date(series['end_date'])) if series['end_date'] else end
+    weekdays = sorted(int(day) for day in series['weekdays'].split(','))
+    anchor = week_start(first_day)
+
+    week = week_start(first)
+    while week <= last:
+        if (week - anchor).days // 7 % series['interval_weeks'] == 0:
+            for weekday in weekdays:
+                day = week + datetime.timedelta(days=weekday)
+                if first <= day <= last:
+                    yield day
+        week += datetime.timedelta(weeks=1)
+
+def series_items(series, start, end, skip):
+    for day in series_occurrences(series, start, end):
+        if (series['id'], day.isoformat()) in skip:
+            continue
+        yield {
+            'id': None,
+            'date': day.isoformat(),
+            'time': series['time'],
+            'sport_type_id': series['sport_type_id'],
+            'sport_name': series['sport_name'],
+            'coach_id': series['coach_id'],
+            'coach_name': f"{series['coach_first_name']} {series['coach_last_name']}",
+            'room': series['room'],
+            'duration': series['duration'],
+            'series_id': series['id'],
+            'occurrence_date': day.isoformat(),
+            'created_at': series['created_at']
+        }
+
+def iter_schedule(cursor, start, end, filters=None):
+    # Sessions and series occurrences in [start, end], merged in (date, time) order.
+    # Cost depends on the window and the number of series, not on history.
+    filters = filters or {}
+    extra = ''.join(f" AND {{alias}}.{column} = ?" for column in filters)
+    params = list(filters.values())
+
+    cursor.execute(
+        SCHEDULE_SELECT + " WHERE ts.date BETWEEN ? AND ?" + extra.format(alias='ts') + " ORDER BY ts.date, ts.time, ts.id",
+        [start.isoformat(), end.isoformat()] + params
+    )
+    sessions = [schedule_item(row) for row in cursor.fetchall()]
+
+    cursor.execute(
+        SERIES_SELECT + " WHERE s.start_date <= ? AND (s.end_date IS NULL OR s.end_date >= ?)" + extra.format(alias='s') + " ORDER BY s.id",
+        [end.isoformat(), start.isoformat()] + params
+    )
+    series_list = cursor.fetchall()
+
+    skip = set()
+    if series_list:
+        ids = [series['id'] for series in series_list]
+        placeholders = ', '.join('?' * len(ids))
+        for table in ('training_series_exceptions', 'training_schedule'):
+            cursor.execute(
+                f"SELECT series_id, occurrence_date FROM {table} WHERE series_id IN ({placeholders}) AND occurrence_date BETWEEN ? AND ?",
+                ids + [start.isoformat(), end.isoformat()]
+            )
+            skip.update((row['series_id'], row['occurrence_date']) for row in cursor.fetchall())
+
+    streams = [sessions] + [series_items(series, start, end, skip) for series in series_list]
+    yield from heapq.merge(*streams, key=lambda item: (item['date'], item['time']))
+
+# Conflict detection
+# Sessions are bucketed per (room or coach, date) and kept sorted by start minute,
+# so an overlap check is a bisect into one small bucket. Buckets are filled from
+# one index range query per date (rows plus series occurrences), lazily, so a single
+# write loads one day and a batch loads only the days it touches.
+def session_identity(session):
+    if session.get('id') is not None:
+        return ('session', session['id'])
+    return ('occurrence', session['series_id'], session['occurrence_date'])
+
+def session_resources(session):
+    resources = []
+    if session.get('room'):
+        resources.append(('room', session['room']))
+    if session.get('coach_id') is not None:
+        resources.append(('coach', session['coach_id']))
+    return resources
+
+class ScheduleIntervals:
+    def __init__(self, cursor=None):
+        # Without a cursor nothing is loaded: the caller adds every session itself
+        self.cursor = cursor
+        self.buckets = {}
+        self.loaded_dates = set()
+
+    def load(self, date):
+        if self.cursor is None or date in self.loaded_dates:
+            return
+        self.loaded_dates.add(date)
+        day = parse_date(date)
+        if day is not None:
+            for session in iter_schedule(self.cursor, day, day):
+                self.add(session)
+
+    def load_range(self, start, end):
+        # Every day in [start, end] from one pass, for checks that span many days
+        for session in iter_schedule(self.cursor, start, end):
+            if session['date'] not in self.loaded_dates:
+                self.add(session)
+        day = start
+        while day <= end:
+            self.loaded_dates.add(day.isoformat())
+            day += datetime.timedelta(days=1)
+
+    def add(self, session, identity=None):
+        start = parse_time(session['time'])
+        if start is None:
+            return
+        end = start + (session.get('duration') or DEFAULT_SESSION_MINUTES)
+        identity = identity or session_identity(session)
+        for resource in session_resources(session):
+            insort(self.buckets.setdefault(resource + (session['date'],), []), (start, end, identity, session))
+
+    def discard(self, identities):
+        for bucket in self.buckets.values():
+            bucket[:] = [entry for entry in bucket if entry[2] not in identities]
+
+    def conflicts(self, session, ignore=None):
+        self.load(session['date'])
+        start = parse_time(session['time'])
+        if start is None:
+            return []
+        end = start + (session.get('duration') or DEFAULT_SESSION_MINUTES)
+
+        found = []
+        for resource in session_resources(session):
+            bucket = self.buckets.get(resource + (session['date'],), [])
+            # Only sessions that start before this one ends can overlap it
+            for index in range(bisect_left(bucket, (end,)) - 1, -1, -1):
+                other_start, other_end, identity, other = bucket[index]
+                if other_end > start and identity != ignore:
+                    found.append({'type': resource[0], 'session': other})
+        return found
+
+def schedule_conflict_response(conflicts):
+    return jsonify({'message': 'Schedule conflict!', 'conflicts': conflicts}), 409
+
+def load_schedule_week(cursor, start):
+    row = cursor.execute("SELECT sessions FROM schedule_weeks WHERE week_start = ?", (start.isoformat(),)).fetchone()
+    if row:
+        return json.loads(row['sessions'])
+    return list(iter_schedule(cursor, start, start + datetime.timedelta(days=6)))
+
+def refresh_schedule_weeks(cursor, dates):
+    starts = {week_start(day) for day in map(parse_date, dates) if day is not None}
+    for start in sorted(starts):
+        sessions = list(iter_schedule(cursor, start, start + datetime.timedelta(days=6)))
+        if sessions:
+            cursor.execute(
+                "INSERT OR REPLACE INTO schedule_weeks (week_start, sessions) VALUES (?, ?)",
+                (start.isoformat(), json.dumps(sessions))
+            )
+        else:
+            cursor.execute("DELETE FROM schedule_weeks WHERE week_start = ?", (start.isoformat(),))
+
+def refresh_schedule_weeks_between(cursor, start_date, end_date):
+    # A series changed: rebuild the stored weeks it spans (end_date None: open-ended)
+    start = week_start(parse_date(start_date)).isoformat()
+    cursor.execute(
+        "SELECT week_start FROM schedule_weeks WHERE week_start >= ? AND (? IS NULL OR week_start <= ?)",
+        (start, end_date, end_date)
     )
-    db.commit()
-    
-    return jsonify({'message': 'Sport type updated successfully!'})
+    refresh_schedule_weeks(cursor, [row['week_start'] for row in cursor.fetchall()])
 
-@app.route('/sport-types/<int:sport_id>', methods=['DELETE'])
-@token_required
-@role_required(['admin'])
-def delete_sport_type(current_user, sport_id):
-    db = get_db()
-    cursor = db.cursor()
-    
-    cursor.execute("SELECT image_path FROM sport_types WHERE id = ?", (sport_id,))
-    sport = cursor.fetchone()
-    
-    if not sport:
-        return jsonify({'message': 'Sport type not found!'}), 404
-    
-    # Delete image file if exists
-    if sport['image_path'] and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], sport['image_path'])):
-        os.remove(os.path.join(app.config['UPLOAD_FOLDER'], sport['image_path']))
-    
-    cursor.execute("DELETE FROM sport_types WHERE id = ?", (sport_id,))
-    db.commit()
-    
-    return jsonify({'message': 'Sport type deleted successfully!'})
+def rebuild_schedule_weeks(cursor):
+    # Every week with a stored session, and the weeks series run in (open-ended ones
+    # up to MAX_SCHEDULE_WINDOW days ahead)
+    horizon = datetime.date.today() + datetime.timedelta(days=MAX_SCHEDULE_WINDOW)
+    cursor.execute("SELECT DISTINCT date FROM training_schedule")
+    dates = [row['date'] for row in cursor.fetchall()]
+    cursor.execute("SELECT start_date, end_date FROM training_series")
+    for series in cursor.fetchall():
+        day = parse_date(series['start_date'])
+        last = min(parse_date(series['end_date']), horizon) if series['end_date'] else horizon
+        while day <= last:
+            dates.append(day.isoformat())
+            day += datetime.timedelta(weeks=1)
+    refresh_schedule_weeks(cursor, dates)
+
+def refresh_schedule_weeks_for(cursor, column, value):
+    # A coach or sport type was renamed or removed: rebuild the weeks that show it
+    cursor.execute(f"SELECT DISTINCT date FROM training_schedule WHERE {column} = ?", (value,))
+    refresh_schedule_weeks(cursor, [row['date'] for row in cursor.fetchall()])
+    cursor.execute(f"SELECT start_date, end_date FROM training_series WHERE {column} = ?", (value,))
+    for series in cursor.fetchall():
+        refresh_schedule_weeks_between(cursor, series['start_date'], series['end_date'])
 
 # Admin routes for training schedule management
+# With both from and to, series occurrences in that window are merged in (see
+# schedule_range); otherwise only stored sessions are listed, straight off the index.
 @app.route('/training-schedule', methods=['GET'])
 @token_required
+@versioned('training_schedule', 'coaches', 'sport_types')
 def get_training_schedule(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    cursor.execute("""
-        SELECT ts.*, c.first_name as coach_first_name, c.last_name as coach_last_name, st.name as sport_name
-        FROM training_schedule ts
-        LEFT JOIN coaches c ON ts.coach_id = c.id
-        LEFT JOIN sport_types st ON ts.sport_type_id = st.id
-        ORDER BY ts.date, ts.time
-    """)
-    
-    schedules = cursor.fetchall()
-    result = []
-    
-    for schedule in schedules:
-        result.append({
-            'id': schedule['id'],
-            'date': schedule['date'],
-            'time': schedule['time'],
-            'sport_type_id': schedule['sport_type_id'],
-            'sport_name': schedule['sport_name'],
-            'coach_id': schedule['coach_id'],
-            'coach_name': f"{schedule['coach_first_name']} {schedule['coach_last_name']}",
-            'room': schedule['room'],
-            'created_at': schedule['created_at']
-        })
-    
-    return jsonify(result)
+    names, error = requested_fields(SCHEDULE_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, after_date = get_page_args()
+    after_time = request.args.get('after_time')
+    conditions = []
+    params = []
+
+    # Calendar range (inclusive) and filters
+    bounds = {}
+    for arg, condition in (('from', "ts.date >= ?"), ('to', "ts.date <= ?")):
+        if request.args.get(arg):
+            day = parse_date(request.args[arg])
+            if day is None:
+                return jsonify({'message': 'Dates must be in YYYY-MM-DD format!'}), 400
+            bounds[arg] = day
+            conditions.append(condition)
+            params.append(day.isoformat())
+    filters = {}
+    for arg in ('coach_id', 'sport_type_id'):
+        value = request.args.get(arg, type=int)
+        if value is not None:
+            filters[arg] = value
+            conditions.append(f"ts.{arg} = ?")
+            params.append(value)
+
+    if len(bounds) == 2:
+        start, end = bounds['from'], bounds['to']
+        if end < start or (end - start).days >= MAX_SCHEDULE_WINDOW:
+            return jsonify({'message': f'The window must be 1 to {MAX_SCHEDULE_WINDOW} days!'}), 400
+        items, next_cursor = schedule_range(cursor, start, end, filters, limit, after_date, after_time, after_id)
+        return page_response([project(item, names) for item in items], next_cursor)
+
+    # Sessions are ordered by (date, time, id), so the cursor carries all three
+    if after_date is not None and after_time is not None and after_id is not None:
+        conditions.append("(ts.date, ts.time, ts.id) > (?, ?, ?)")
+        params.extend([after_date, after_time, after_id])
+    elif after_date is not None:
+        conditions.append("ts.date > ?")
+        params.append(after_date)
+
+    cursor.execute(
+        SCHEDULE_SELECT + f"{where_clause(conditions)} ORDER BY ts.date, ts.time, ts.id LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+
+    schedules, next_cursor = paginate(
+        cursor.fetchall(), limit,
+        lambda row: {'after_date': row['date'], 'after_time': row['time'], 'after_id': row['id']}
+    )
+    result = [project(schedule_item(schedule), names) for schedule in schedules]
+
+    return page_response(result, next_cursor)
+
+def schedule_order(item):
+    # Total order of a merged window: iter_schedule yields stored sessions (by id)
+    # before generated occurrences (by series id) at the same date and time
+    return (item['date'], item['time'], item['id'] is None, item['id'] if item['id'] is not None else item['series_id'])
+
+def schedule_cursor(item):
+    if item['id'] is not None:
+        return {'after_date': item['date'], 'after_time': item['time'], 'after_id': item['id']}
+    return {'after_date': item['date'], 'after_time': item['time'], 'after_series_id': item['series_id']}
+
+def schedule_range(cursor, start, end, filters, limit, after_date, after_time, after_id):
+    # One page of iter_schedule's window. A cursor at an occurrence carries
+    # after_series_id instead of after_id.
+    after_series_id = request.args.get('after_series_id', type=int)
+    after = None
+    if after_date is not None and after_time is not None and (after_id is not None or after_series_id is not None):
+        after = (after_date, after_time, after_id is None, after_id if after_id is not None else after_series_id)
+    day = parse_date(after_date) if after_date is not None else None
+    if day is not None:
+        start = max(start, day if after is not None else day + datetime.timedelta(days=1))
+
+    items = []
+    for item in iter_schedule(cursor, start, end, filters):
+        if after is not None and schedule_order(item) <= after:
+            continue
+        items.append(item)
+        if limit is not None and len(items) > limit:
+            break
+    return paginate(items, limit, schedule_cursor)
+
+# One week (Monday to Sunday) containing ?date= (default: today), stored or expanded on read
+@app.route('/training-schedule/week', methods=['GET'])
+@token_required
+@versioned('training_schedule', 'coaches', 'sport_types', vary_on=lambda: week_start(datetime.date.today()))
+def get_training_schedule_week(current_user):
+    day = datetime.date.today()
+    if request.args.get('date'):
+        day = parse_date(request.args['date'])
+        if day is None:
+            return jsonify({'message': 'Dates must be in YYYY-MM-DD format!'}), 400
+    start = week_start(day)
+
+    db = get_db(readonly=True)
+    sessions = load_schedule_week(db.cursor(), start)
+
+    for arg in ('coach_id', 'sport_type_id'):
+        value = request.args.get(arg, type=int)
+        if value is not None:
+            sessions = [session for session in sessions if session[arg] == value]
+
+    return jsonify({
+        'week_start': start.isoformat(),
+        'week_end': (start + datetime.timedelta(days=6)).isoformat(),
+        'items': sessions
+    })
 
 @app.route('/training-schedule', methods=['POST'])
 @token_required
@@ -1007,26 +3226,37 @@ def get_training_schedule(current_user):
 def add_training_schedule(current_user):
     data = request.json
     
-    if not data.get('date') or not data.get('time'):
-        return jsonify({'message': 'Date and time are required!'}), 400
+    values, error = schedule_values(data or {})
+    if error:
+        return jsonify({'message': error}), 400
     
     db = get_db()
     cursor = db.cursor()
+    # The conflict check and the insert must see the same rows
+    db.execute("BEGIN IMMEDIATE")
+    
+    conflicts = ScheduleIntervals(cursor).conflicts(values)
+    if conflicts:
+        return schedule_conflict_response(conflicts)
     
     cursor.execute(
-        """INSERT INTO training_schedule (date, time, sport_type_id, coach_id, room) 
-        VALUES (?, ?, ?, ?, ?)""",
+        """INSERT INTO training_schedule (date, time, duration, sport_type_id, coach_id, room) 
+        VALUES (?, ?, ?, ?, ?, ?)""",
         (
-            data['date'], 
-            data['time'], 
-            data.get('sport_type_id'), 
-            data.get('coach_id'), 
-            data.get('room', '')
+            values['date'], 
+            values['time'], 
+            values['duration'], 
+            values['sport_type_id'], 
+            values['coach_id'], 
+            values['room']
         )
     )
+    schedule_id = cursor.lastrowid
+    refresh_schedule_weeks(cursor, [values['date']])
+    bump_versions(cursor, 'training_schedule')
     db.commit()
     
-    return jsonify({'message': 'Training schedule added successfully!', 'id': cursor.lastrowid})
+    return jsonify({'message': 'Training schedule added successfully!', 'id': schedule_id})
 
 @app.route('/training-schedule/<int:schedule_id>', methods=['PUT'])
 @token_required
@@ -1039,6 +3269,8 @@ def update_training_schedule(current_user, schedule_id):
     
     db = get_db()
     cursor = db.cursor()
+    # The conflict check and the update must see the same rows
+    db.execute("BEGIN IMMEDIATE")
     
     cursor.execute("SELECT * FROM training_schedule WHERE id = ?", (schedule_id,))
     schedule = cursor.fetchone()
@@ -1046,18 +3278,25 @@ def update_training_schedule(current_user, schedule_id):
     if not schedule:
         return jsonify({'message': 'Training schedule not found!'}), 404
     
-    date = data.get('date', schedule['date'])
-    time = data.get('time', schedule['time'])
-    sport_type_id = data.get('sport_type_id', schedule['sport_type_id'])
-    coach_id = data.get('coach_id', schedule['coach_id'])
-    room = data.get('room', schedule['room'])
+    values, error = schedule_values(data, schedule)
+    if error:
+        return jsonify({'message': error}), 400
+    
+    conflicts = ScheduleIntervals(cursor).conflicts(values, ignore=('session', schedule_id))
+    if conflicts:
+        return schedule_conflict_response(conflicts)
     
     cursor.execute(
         """UPDATE training_schedule 
-        SET date = ?, time = ?, sport_type_id = ?, coach_id = ?, room = ? 
+        SET date = ?, time = ?, duration = ?, sport_type_id = ?, coach_id = ?, room = ? 
         WHERE id = ?""",
-        (date, time, sport_type_id, coach_id, room, schedule_id)
+        (
+            values['date'], values['time'], values['duration'], values['sport_type_id'],
+            values['coach_id'], values['room'], schedule_id
+        )
     )
+    refresh_schedule_weeks(cursor, [schedule['date'], values['date']])
+    bump_versions(cursor, 'training_schedule')
     db.commit()
     
     return jsonify({'message': 'Training schedule updated successfully!'})
@@ -1069,37 +3308,541 @@ def delete_training_schedule(current_user, schedule_id):
     db = get_db()
     cursor = db.cursor()
     
-    cursor.execute("DELETE FROM training_schedule WHERE id = ?", (schedule_id,))
-    db.commit()
+    cursor.execute("DELETE FROM training_schedule WHERE id = ? RETURNING date", (schedule_id,))
+    deleted = cursor.fetchone()
     
-    if cursor.rowcount == 0:
+    if not deleted:
         return jsonify({'message': 'Training schedule not found!'}), 404
     
+    refresh_schedule_weeks(cursor, [deleted['date']])
+    bump_versions(cursor, 'training_schedule')
+    db.commit()
+    
     return jsonify({'message': 'Training schedule deleted successfully!'})
 
+# Apply many creates, updates and deletes in one transaction, all or nothing
+MAX_BATCH_OPERATIONS = 1000
+
+@app.route('/training-schedule/batch', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def batch_training_schedule(current_user):
+    operations = (request.json or {}).get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'message': 'A list of operations is required!'}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({'message': f'At most {MAX_BATCH_OPERATIONS} operations per batch!'}), 400
+
+    db = get_db()
+    cursor = db.cursor()
+    # Validation reads and the writes must see the same rows
+    db.execute("BEGIN IMMEDIATE")
+
+    ids = list({
+        op.get('id') for op in operations
+        if isinstance(op, dict) and op.get('op') in ('update', 'delete')
+        and isinstance(op.get('id'), int) and not isinstance(op.get('id'), bool)
+    })
+    rows = {}
+    if ids:
+        placeholders = ', '.join('?' * len(ids))
+        cursor.execute(f"SELECT * FROM training_schedule WHERE id IN ({placeholders})", ids)
+        rows = {row['id']: dict(row) for row in cursor.fetchall()}
+    original = dict(rows)
+
+    # Validate in order, each operation against the state the previous ones leave.
+    # final maps a session to the operation that last wrote it and its new values.
+    results = []
+    final = {}
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+        result = {'index': index, 'op': kind, 'status': 'ok'}
+        results.append(result)
+        if kind not in ('create', 'update', 'delete'):
+            result.update(status='error', message="op must be 'create', 'update' or 'delete'!")
+            continue
+
+        if kind == 'create':
+            values, error = schedule_values(op)
+            if error:
+                result.update(status='error', message=error)
+                continue
+            final[('new', index)] = (index, dict(values, id=None, index=index))
+            continue
+
+        schedule_id = result['id'] = op.get('id')
+        if not isinstance(schedule_id, int) or isinstance(schedule_id, bool):
+            result.update(status='error', message='id must be an integer!')
+            continue
+        if schedule_id not in rows:
+            result.update(status='error', message='Training schedule not found!')
+            continue
+        if kind == 'delete':
+            del rows[schedule_id]
+            final[('session', schedule_id)] = (index, None)
+            continue
+        values, error = schedule_values(op, rows[schedule_id])
+        if error:
+            result.update(status='error', message=error)
+            continue
+        rows[schedule_id] = dict(rows[schedule_id], **values)
+        final[('session', schedule_id)] = (index, rows[schedule_id])
+
+    failed = [result for result in results if result['status'] == 'error']
+    if failed:
+        return jsonify({'message': 'Batch rejected, nothing was changed!', 'results': results}), 400
+
+    creates = [session for identity, (_, session) in final.items() if identity[0] == 'new']
+    updates = [session for identity, (_, session) in final.items() if identity[0] == 'session' and session]
+    deletes = [identity[1] for identity, (_, session) in final.items() if session is None]
+    columns = ('date', 'time', 'duration', 'sport_type_id', 'coach_id', 'room')
+
+    cursor.executemany("DELETE FROM training_schedule WHERE id = ?", [(schedule_id,) for schedule_id in deletes])
+    cursor.executemany(
+        "UPDATE training_schedule SET date = ?, time = ?, duration = ?, sport_type_id = ?, coach_id = ?, room = ? WHERE id = ?",
+        [tuple(session[column] for column in columns) + (session['id'],) for session in updates]
+    )
+    cursor.executemany(
+        "INSERT INTO training_schedule (date, time, duration, sport_type_id, coach_id, room) VALUES (?, ?, ?, ?, ?, ?)",
+        [tuple(session[column] for column in columns) for session in creates]
+    )
+    created_ids = {}
+    if creates:
+        # We hold the write lock, so AUTOINCREMENT handed out consecutive ids ending at seq
+        last_id = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'training_schedule'").fetchone()['seq']
+        for offset, session in enumerate(creates):
+            created_ids[session['index']] = last_id - len(creates) + 1 + offset
+
+    # Check the state after the whole batch, so sessions can swap slots. Every
+    # session it wrote is a candidate, and so is the occurrence that comes back
+    # when an override is deleted.
+    candidates = {('session', schedule_id): index for index, schedule_id in created_ids.items()}
+    touched_dates = {row['date'] for row in original.values()}
+    for identity, (index, session) in final.items():
+        if session:
+            touched_dates.add(session['date'])
+            if identity[0] == 'session':
+                candidates[identity] = index
+        elif original[identity[1]]['series_id'] is not None:
+            row = original[identity[1]]
+            touched_dates.add(row['occurrence_date'])
+            candidates[('occurrence', row['series_id'], row['occurrence_date'])] = index
+
+    for date in sorted(touched_dates):
+        day = parse_date(date)
+        if day is None:
+            continue
+        sessions = list(iter_schedule(cursor, day, day))
+        intervals = ScheduleIntervals()
+        for session in sessions:
+            intervals.add(session)
+        for session in sessions:
+            identity = session_identity(session)
+            conflicts = intervals.conflicts(session, ignore=identity) if identity in candidates else []
+            if conflicts:
+                results[candidates[identity]].update(status='error', message='Schedule conflict!', conflicts=conflicts)
+
+    if any(result['status'] == 'error' for result in results):
+        db.rollback()
+        return jsonify({'message': 'Batch rejected, nothing was changed!', 'results': results}), 409
+
+    for index, schedule_id in created_ids.items():
+        results[index]['id'] = schedule_id
+    refresh_schedule_weeks(cursor, touched_dates)
+    bump_versions(cursor, 'training_schedule')
+    db.commit()
+
+    return jsonify({'message': 'Batch applied successfully!', 'results': results})
+
+# Every session in [from, to], with series occurrences expanded
+@app.route('/training-schedule/occurrences', methods=['GET'])
+@token_required
+@versioned('training_schedule', 'coaches', 'sport_types')
+def get_training_occurrences(current_user):
+    start = parse_date(request.args.get('from'))
+    end = parse_date(request.args.get('to'))
+    if start is None or end is None:
+        return jsonify({'message': 'from and to dates (YYYY-MM-DD) are required!'}), 400
+    if end < start or (end - start).days >= MAX_SCHEDULE_WINDOW:
+        return jsonify({'message': f'The window must be 1 to {MAX_SCHEDULE_WINDOW} days!'}), 400
+
+    filters = {}
+    for arg in ('coach_id', 'sport_type_id'):
+        value = request.args.get(arg, type=int)
+        if value is not None:
+            filters[arg] = value
+
+    db = get_db(readonly=True)
+    return jsonify({'items': list(iter_schedule(db.cursor(), start, end, filters))})
+
+# Double-booked rooms and coaches in [from, to], found in one pass over the window
+@app.route('/training-schedule/conflicts', methods=['GET'])
+@token_required
+@role_required(['admin'])
+@versioned('training_schedule', 'coaches', 'sport_types')
+def get_training_conflicts(current_user):
+    start = parse_date(request.args.get('from'))
+    end = parse_date(request.args.get('to'))
+    if start is None or end is None:
+        return jsonify({'message': 'from and to dates (YYYY-MM-DD) are required!'}), 400
+    if end < start or (end - start).days >= MAX_SCHEDULE_WINDOW:
+        return jsonify({'message': f'The window must be 1 to {MAX_SCHEDULE_WINDOW} days!'}), 400
+
+    db = get_db(readonly=True)
+    intervals = ScheduleIntervals()
+    conflicts = []
+    for session in iter_schedule(db.cursor(), start, end):
+        for conflict in intervals.conflicts(session):
+            conflicts.append({
+                'type': conflict['type'],
+                'date': session['date'],
+                'sessions': [conflict['session'], session]
+            })
+        intervals.add(session)
+
+    return jsonify({'items': conflicts})
+
+# Recurring training series
+def series_response(series):
+    return {
+        'id': series['id'],
+        'weekdays': [int(day) for day in series['weekdays'].split(',')],
+        'interval_weeks': series['interval_weeks'],
+        'time': series['time'],
+        'duration': series['duration'],
+        'start_date': series['start_date'],
+        'end_date': series['end_date'],
+        'sport_type_id': series['sport_type_id'],
+        'sport_name': series['sport_name'],
+        'coach_id': series['coach_id'],
+        'coach_name': f"{series['coach_first_name']} {series['coach_last_name']}",
+        'room': series['room'],
+        'created_at': series['created_at']
+    }
+
+# weekdays and coach_name are built in Python, so ?fields= trims the response
+SERIES_FIELDS = (
+    'id', 'weekdays', 'interval_weeks', 'time', 'duration', 'start_date', 'end_date', 'sport_type_id',
+    'sport_name', 'coach_id', 'coach_name', 'room', 'created_at'
+)
+
+def series_values(data, series=None):
+    # Validated columns for a series from a request body, applied on top of an existing one.
+    # Returns (values, error message).
+    values = dict(series) if series else {
+        'interval_weeks': 1, 'duration': DEFAULT_SESSION_MINUTES, 'end_date': None,
+        'sport_type_id': None, 'coach_id': None, 'room': ''
+    }
+    for key in ('weekdays', 'interval_weeks', 'time', 'duration', 'start_date', 'end_date', 'sport_type_id', 'coach_id', 'room'):
+        if key in data:
+            values[key] = data[key]
+
+    if not values.get('weekdays') or not values.get('time') or not values.get('start_date'):
+        return None, 'Weekdays, time and start date are required!'
+    weekdays = values['weekdays']
+    if isinstance(weekdays, str):
+        weekdays = weekdays.split(',')
+    try:
+        weekdays = sorted({int(day) for day in weekdays})
+    except (TypeError, ValueError):
+        weekdays = []
+    if not weekdays or weekdays[0] < 0 or weekdays[-1] > 6:
+        return None, 'Weekdays must be numbers from 0 (Monday) to 6 (Sunday)!'
+    values['weekdays'] = ','.join(str(day) for day in weekdays)
+
+    if not isinstance(values['interval_weeks'], int) or values['interval_weeks'] < 1:
+        return None, 'Interval must be a positive number of weeks!'
+    start_minute = parse_time(values['time'])
+    if start_minute is None:
+        return None, 'Time must be in HH:MM format!'
+    values['time'] = format_time(start_minute)
+    if not isinstance(values['duration'], int) or values['duration'] < 1 or start_minute + values['duration'] > 24 * 60:
+        return None, 'Duration must be a number of minutes within the day!'
+    start = parse_date(values['start_date'])
+    end = parse_date(values['end_date']) if values['end_date'] else None
+    if start is None or (values['end_date'] and end is None):
+        return None, 'Dates must be in YYYY-MM-DD format!'
+    if end is not None and end < start:
+        return None, 'End date must not be before start date!'
+    return values, None
+
+def series_conflicts(cursor, values, series=None):
+    # Clashes of a new or changed series with everything else, over its whole span
+    # (open-ended: MAX_SCHEDULE_WINDOW days from today or its start, whichever is later)
+    start = parse_date(values['start_date'])
+    if values['end_date']:
+        end = parse_date(values['end_date'])
+    else:
+        start = max(start, datetime.date.today())
+        end = start + datetime.timedelta(days=MAX_SCHEDULE_WINDOW - 1)
+    if end < start:
+        return []
+
+    intervals = ScheduleIntervals(cursor)
+    intervals.load_range(start, end)
+    skip = set()
+    if series:
+        # The series' current occurrences are being replaced; overridden and
+        # cancelled dates stay as they are
+        intervals.discard({('occurrence', series['id'], day.isoformat()) for day in series_occurrences(series, start, end)})
+        for table in ('training_series_exceptions', 'training_schedule'):
+            cursor.execute(
+                f"SELECT occurrence_date FROM {table} WHERE series_id = ? AND occurrence_date BETWEEN ? AND ?",
+                (series['id'], start.isoformat(), end.isoformat())
+            )
+            skip.update(row['occurrence_date'] for row in cursor.fetchall())
+
+    conflicts = []
+    for day in series_occurrences(values, start, end):
+        if day.isoformat() not in skip:
+            conflicts.extend(intervals.conflicts(dict(values, date=day.isoformat())))
+    return conflicts
+
+def find_series(cursor, series_id):
+    cursor.execute("SELECT * FROM training_series WHERE id = ?", (series_id,))
+    return cursor.fetchone()
+
+@app.route('/training-series', methods=['GET'])
+@token_required
+@versioned('training_schedule', 'coaches', 'sport_types')
+def get_training_series(current_user):
+    db = get_db(readonly=True)
+    cursor = db.cursor()
+
+    names, error = requested_fields(SERIES_FIELDS)
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, _ = get_page_args()
+    conditions = []
+    params = []
+    if after_id is not None:
+        conditions.append("s.id > ?")
+        params.append(after_id)
+    for arg in ('coach_id', 'sport_type_id'):
+        value = request.args.get(arg, type=int)
+        if value is not None:
+            conditions.append(f"s.{arg} = ?")
+            params.append(value)
+
+    cursor.execute(SERIES_SELECT + f"{where_clause(conditions)} ORDER BY s.id LIMIT ?", params + [fetch_limit(limit)])
+    series_list, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+    return page_response([project(series_response(series), names) for series in series_list], next_cursor)
+
+@app.route('/training-series', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def add_training_series(current_user):
+    values, error = series_values(request.json or {})
+    if error:
+        return jsonify({'message': error}), 400
+
+    db = get_db()
+    cursor = db.cursor()
+    # The conflict check and the insert must see the same rows
+    db.execute("BEGIN IMMEDIATE")
+    conflicts = series_conflicts(cursor, values)
+    if conflicts:
+        return schedule_conflict_response(conflicts)
+
+    cursor.execute(
+        """INSERT INTO training_series (weekdays, interval_weeks, time, duration, start_date, end_date, sport_type_id, coach_id, room)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            values['weekdays'], values['interval_weeks'], values['time'], values['duration'], values['start_date'],
+            values['end_date'], values['sport_type_id'], values['coach_id'], values['room']
+        )
+    )
+    series_id = cursor.lastrowid
+    refresh_schedule_weeks_between(cursor, values['start_date'], values['end_date'])
+    bump_versions(cursor, 'training_schedule')
+    db.commit()
+
+    return jsonify({'message': 'Training series added successfully!', 'id': series_id})
+
+@app.route('/training-series/<int:series_id>', methods=['PUT'])
+@token_required
+@role_required(['admin'])
+def update_training_series(current_user, series_id):
+    data = request.json
+    if not data:
+        return jsonify({'message': 'No data provided!'}), 400
+
+    db = get_db()
+    cursor = db.cursor()
+    # The conflict check and the update must see the same rows
+    db.execute("BEGIN IMMEDIATE")
+    series = find_series(cursor, series_id)
+    if not series:
+        return jsonify({'message': 'Training series not found!'}), 404
+
+    values, error = series_values(data, series)
+    if error:
+        return jsonify({'message': error}), 400
+    conflicts = series_conflicts(cursor, values, series)
+    if conflicts:
+        return schedule_conflict_response(conflicts)
+
+    cursor.execute(
+        """UPDATE training_series
+        SET weekdays = ?, interval_weeks = ?, time = ?, duration = ?, start_date = ?, end_date = ?, sport_type_id = ?, coach_id = ?, room = ?
+        WHERE id = ?""",
+        (
+            values['weekdays'], values['interval_weeks'], values['time'], values['duration'], values['start_date'],
+            values['end_date'], values['sport_type_id'], values['coach_id'], values['room'], series_id
+        )
+    )
+    # Rebuild both the old and the new span
+    end_dates = [series['end_date'], values['end_date']]
+    refresh_schedule_weeks_between(
+        cursor, min(series['start_date'], values['start_date']), None if None in end_dates else max(end_dates)
+    )
+    bump_versions(cursor, 'training_schedule')
+    db.commit()
+
+    return jsonify({'message': 'Training series updated successfully!'})
+
+@app.route('/training-series/<int:series_id>', methods=['DELETE'])
+@token_required
+@role_required(['admin'])
+def delete_training_series(current_user, series_id):
+    db = get_db()
+    cursor = db.cursor()
+    series = find_series(cursor, series_id)
+    if not series:
+        return jsonify({'message': 'Training series not found!'}), 404
+
+    # Overrides go with the series
+    cursor.execute("DELETE FROM training_schedule WHERE series_id = ? RETURNING date", (series_id,))
+    override_dates = [row['date'] for row in cursor.fetchall()]
+    cursor.execute("DELETE FROM training_series_exceptions WHERE series_id = ?", (series_id,))
+    cursor.execute("DELETE FROM training_series WHERE id = ?", (series_id,))
+    refresh_schedule_weeks(cursor, override_dates)
+    refresh_schedule_weeks_between(cursor, series['start_date'], series['end_date'])
+    bump_versions(cursor, 'training_schedule')
+    db.commit()
+
+    return jsonify({'message': 'Training series deleted successfully!'})
+
+def find_occurrence(cursor, series_id, occurrence_date):
+    # The series, if occurrence_date is one of its generated dates
+    series = find_series(cursor, series_id)
+    day = parse_date(occurrence_date)
+    if not series or day is None or day not in series_occurrences(series, day, day):
+        return None
+    return series
+
+# Change one occurrence: it becomes a training_schedule row (an override)
+@app.route('/training-series/<int:series_id>/occurrences/<occurrence_date>', methods=['PUT'])
+@token_required
+@role_required(['admin'])
+def override_training_occurrence(current_user, series_id, occurrence_date):
+    data = request.json or {}
+
+    db = get_db()
+    cursor = db.cursor()
+    # The conflict check and the write must see the same rows
+    db.execute("BEGIN IMMEDIATE")
+    series = find_occurrence(cursor, series_id, occurrence_date)
+    if not series:
+        return jsonify({'message': 'Occurrence not found!'}), 404
+
+    cursor.execute(
+        "SELECT * FROM training_schedule WHERE series_id = ? AND occurrence_date = ?",
+        (series_id, occurrence_date)
+    )
+    override = cursor.fetchone()
+    current = override or dict(series, date=occurrence_date)
+
+    values, error = schedule_values(data, current)
+    if error:
+        return jsonify({'message': error}), 400
+
+    ignore = ('session', override['id']) if override else ('occurrence', series_id, occurrence_date)
+    conflicts = ScheduleIntervals(cursor).conflicts(values, ignore=ignore)
+    if conflicts:
+        return schedule_conflict_response(conflicts)
+
+    row = (
+        values['date'], values['time'], values['duration'], values['sport_type_id'],
+        values['coach_id'], values['room']
+    )
+    if override:
+        cursor.execute(
+            "UPDATE training_schedule SET date = ?, time = ?, duration = ?, sport_type_id = ?, coach_id = ?, room = ? WHERE id = ?",
+            row + (override['id'],)
+        )
+        schedule_id = override['id']
+    else:
+        cursor.execute(
+            """INSERT INTO training_schedule (date, time, duration, sport_type_id, coach_id, room, series_id, occurrence_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            row + (series_id, occurrence_date)
+        )
+        schedule_id = cursor.lastrowid
+    # An override also brings back a cancelled occurrence
+    cursor.execute(
+        "DELETE FROM training_series_exceptions WHERE series_id = ? AND occurrence_date = ?",
+        (series_id, occurrence_date)
+    )
+    refresh_schedule_weeks(cursor, [occurrence_date, current['date'], values['date']])
+    bump_versions(cursor, 'training_schedule')
+    db.commit()
+
+    return jsonify({'message': 'Occurrence updated successfully!', 'id': schedule_id})
+
+# Cancel one occurrence
+@app.route('/training-series/<int:series_id>/occurrences/<occurrence_date>', methods=['DELETE'])
+@token_required
+@role_required(['admin'])
+def cancel_training_occurrence(current_user, series_id, occurrence_date):
+    db = get_db()
+    cursor = db.cursor()
+    if not find_occurrence(cursor, series_id, occurrence_date):
+        return jsonify({'message': 'Occurrence not found!'}), 404
+
+    cursor.execute(
+        "DELETE FROM training_schedule WHERE series_id = ? AND occurrence_date = ? RETURNING date",
+        (series_id, occurrence_date)
+    )
+    override_dates = [row['date'] for row in cursor.fetchall()]
+    cursor.execute(
+        "INSERT OR IGNORE INTO training_series_exceptions (series_id, occurrence_date) VALUES (?, ?)",
+        (series_id, occurrence_date)
+    )
+    refresh_schedule_weeks(cursor, [occurrence_date] + override_dates)
+    bump_versions(cursor, 'training_schedule')
+    db.commit()
+
+    return jsonify({'message': 'Occurrence cancelled successfully!'})
+
 # Admin routes for results management
 @app.route('/results', methods=['GET'])
 @token_required
+@versioned('results')
 def get_results(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
-    cursor.execute("SELECT * FROM results ORDER BY date DESC")
-    
-    results = cursor.fetchall()
-    result_list = []
-    
-    for res in results:
-        result_list.append({
-            'id': res['id'],
-            'competition_name': res['competition_name'],
-            'date': res['date'],
-            'image_path': res['image_path'],
-            'description': res['description'],
-            'created_at': res['created_at']
-        })
-    
-    return jsonify(result_list)
+    names, columns, error = select_fields(RESULT_FIELDS, required=('id', 'date'))
+    if error:
+        return jsonify({'message': error}), 400
+
+    limit, after_id, after_date = get_page_args()
+    conditions, params = date_desc_conditions(after_date, after_id)
+
+    cursor.execute(
+        f"SELECT {columns} FROM results{where_clause(conditions)} ORDER BY IFNULL(date, '') DESC, id DESC LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+
+    results, next_cursor = paginate(cursor.fetchall(), limit, date_desc_cursor)
+    srcsets = {}
+    if 'image_srcset' in names:
+        srcsets = load_image_srcsets(cursor, [res['image_path'] for res in results])
+
+    derived = {'image_srcset': lambda row: srcsets.get(row['image_path'])}
+    return page_response([project(res, names, derived) for res in results], next_cursor)
 
 @app.route('/results', methods=['POST'])
 @token_required
@@ -1123,6 +3866,7 @@ def add_result(current_user):
         "INSERT INTO results (competition_name, date, image_path, description) VALUES (?, ?, ?, ?)",
         (competition_name, date, image_path, description)
     )
+    bump_versions(cursor, 'results')
     db.commit()
     
     return jsonify({'message': 'Result added successfully!', 'id': cursor.lastrowid})
@@ -1147,8 +3891,7 @@ def update_result(current_user, result_id):
     
     if 'image' in request.files and request.files['image'].filename:
         # Delete old image if exists
-        if image_path and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], image_path)):
-            os.remove(os.path.join(app.config['UPLOAD_FOLDER'], image_path))
+        delete_upload(cursor, image_path)
         
         # Save new image
         image_path = save_file(request.files['image'], 'results')
@@ -1157,6 +3900,7 @@ def update_result(current_user, result_id):
         "UPDATE results SET competition_name = ?, date = ?, image_path = ?, description = ? WHERE id = ?",
         (competition_name, date, image_path, description, result_id)
     )
+    bump_versions(cursor, 'results')
     db.commit()
     
     return jsonify({'message': 'Result updated successfully!'})
@@ -1175,19 +3919,153 @@ def delete_result(current_user, result_id):
         return jsonify({'message': 'Result not found!'}), 404
     
     # Delete image file if exists
-    if result['image_path'] and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], result['image_path'])):
-        os.remove(os.path.join(app.config['UPLOAD_FOLDER'], result['image_path']))
+    delete_upload(cursor, result['image_path'])
     
     cursor.execute("DELETE FROM results WHERE id = ?", (result_id,))
+    bump_versions(cursor, 'results')
     db.commit()
     
     return jsonify({'message': 'Result deleted successfully!'})
 
+# Hashing pool health
+@app.route('/metrics/hashing', methods=['GET'])
+@token_required
+@role_required(['admin'])
+def hashing_metrics_view(current_user):
+    with hashing_lock:
+        metrics = dict(hashing_metrics)
+    completed = metrics['completed']
+    metrics['latency_avg_ms'] = metrics['latency_total_ms'] / completed if completed else 0.0
+    metrics['workers'] = app.config['HASH_WORKERS']
+    metrics['queue_size'] = app.config['HASH_QUEUE_SIZE']
+    return jsonify(metrics)
+
+# Background job status
+@app.route('/jobs', methods=['GET'])
+@token_required
+@role_required(['admin'])
+def get_jobs(current_user):
+    db = get_db(readonly=True)
+    cursor = db.cursor()
+
+    cursor.execute("SELECT status, COUNT(*) as count FROM jobs GROUP BY status")
+    counts = {row['status']: row['count'] for row in cursor.fetchall()}
+
+    limit, after_id, _ = get_page_args(paged=True)
+    conditions = []
+    params = []
+
+    status = request.args.get('status')
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+
+    if after_id is not None:
+        conditions.append("id < ?")
+        params.append(after_id)
+
+    cursor.execute(
+        f"SELECT * FROM jobs{where_clause(conditions)} ORDER BY id DESC LIMIT ?",
+        params + [fetch_limit(limit)]
+    )
+    jobs, next_cursor = paginate(cursor.fetchall(), limit, id_cursor)
+
+    return jsonify({'counts': counts, 'items': [dict(job) for job in jobs], 'next_cursor': next_cursor})
+
+@app.route('/jobs/<int:job_id>', methods=['GET'])
+@token_required
+@role_required(['admin'])
+def get_job(current_user, job_id):
+    db = get_db(readonly=True)
+    job = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    if not job:
+        return jsonify({'message': 'Job not found!'}), 404
+
+    return jsonify(dict(job))
+
+@app.route('/jobs/<int:job_id>/retry', methods=['POST'])
+@token_required
+@role_required(['admin'])
+def retry_job(current_user, job_id):
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute(
+        "UPDATE jobs SET status = 'queued', attempts = 0, run_after = ?, finished_at = NULL WHERE id = ? AND status = 'failed'",
+        (time.time(), job_id)
+    )
+    db.commit()
+
+    if cursor.rowcount == 0:
+        return jsonify({'message': 'Failed job not found!'}), 404
+
+    return jsonify({'message': 'Job queued for retry!'})
+
+# Unified search across people, news and results
+@app.route('/search', methods=['GET'])
+@token_required
+def search(current_user):
+    term = request.args.get('q', '')
+    query = fts_query(term)
+    if not query:
+        return jsonify({'message': 'Search query is required!'}), 400
+
+    limit = max(1, min(request.args.get('limit', 10, type=int), MAX_PAGE_SIZE))
+    types = request.args.get('type')
+    types = set(types.split(',')) if types else {'students', 'coaches', 'news', 'results'}
+
+    # Students are only visible to admins and coaches, same as /students/view
+    if current_user['role'] not in ('admin', 'coach'):
+        types.discard('students')
+
+    db = get_db(readonly=True)
+    cursor = db.cursor()
+    result = {}
+
+    if 'students' in types:
+        cursor.execute("""
+            SELECT s.id, s.first_name, s.last_name, s.phone
+            FROM students_fts f JOIN students s ON s.id = f.rowid
+            WHERE students_fts MATCH ?
+            ORDER BY f.rank LIMIT ?
+        """, (fts_query(term, ['first_name', 'last_name', 'phone']), limit))
+        result['students'] = [dict(row) for row in cursor.fetchall()]
+
+    if 'coaches' in types:
+        cursor.execute("""
+            SELECT c.id, c.first_name, c.last_name, f.sport_name
+            FROM coaches_fts f JOIN coaches c ON c.id = f.rowid
+            WHERE coaches_fts MATCH ?
+            ORDER BY f.rank LIMIT ?
+        """, (fts_query(term, ['first_name', 'last_name', 'sport_name']), limit))
+        result['coaches'] = [dict(row) for row in cursor.fetchall()]
+
+    if 'news' in types:
+        cursor.execute("""
+            SELECT n.id, n.title, n.date, snippet(news_fts, 1, '', '', '...', 16) as excerpt
+            FROM news_fts f JOIN news n ON n.id = f.rowid
+            WHERE news_fts MATCH ?
+            ORDER BY f.rank LIMIT ?
+        """, (query, limit))
+        result['news'] = [dict(row) for row in cursor.fetchall()]
+
+    if 'results' in types:
+        cursor.execute("""
+            SELECT r.id, r.competition_name, r.date, r.image_path
+            FROM results_fts f JOIN results r ON r.id = f.rowid
+            WHERE results_fts MATCH ?
+            ORDER BY f.rank LIMIT ?
+        """, (query, limit))
+        result['results'] = [dict(row) for row in cursor.fetchall()]
+
+    return jsonify(result)
+
 # User profile routes
 @app.route('/profile', methods=['GET'])
 @token_required
 def get_profile(current_user):
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
     
     role = current_user['role']
@@ -1231,18 +4109,19 @@ def update_password(current_user):
     user_id = current_user['id']
     
     if role == 'admin':
-        cursor.execute("SELECT password FROM admins WHERE id = ?", (user_id,))
+        cursor.execute("SELECT login, password FROM admins WHERE id = ?", (user_id,))
     elif role == 'coach':
-        cursor.execute("SELECT password FROM coaches WHERE id = ?", (user_id,))
+        cursor.execute("SELECT login, password FROM coaches WHERE id = ?", (user_id,))
     elif role == 'student':
-        cursor.execute("SELECT password FROM students WHERE id = ?", (user_id,))
+        cursor.execute("SELECT login, password FROM students WHERE id = ?", (user_id,))
     
     user = cursor.fetchone()
     
-    if not user or not check_password_hash(user['password'], data['current_password']):
+    if not user or not verify_password(user['password'], data['current_password']):
         return jsonify({'message': 'Current password is incorrect!'}), 401
     
-    hashed_password = generate_password_hash(data['new_password'])
+    hashed_password = hash_password(data['new_password'])
+    forget_credentials(user['login'])
     
     if role == 'admin':
         cursor.execute("UPDATE admins SET password = ? WHERE id = ?", (hashed_password, user_id))
@@ -1251,23 +4130,62 @@ def update_password(current_user):
     elif role == 'student':
         cursor.execute("UPDATE students SET password = ? WHERE id = ?", (hashed_password, user_id))
     
+    # Sign out every other session; this one continues with fresh tokens
+    revoke_tokens(cursor, role, user_id)
+    tokens = token_pair(cursor, user_id, role)
     db.commit()
     
-    return jsonify({'message': 'Password updated successfully!'})
+    return jsonify({'message': 'Password updated successfully!', **tokens})
 
 # Serve uploaded files
+# An upload's name never points at different content (blobs are named by digest,
+# older uploads by uuid), so clients may keep them for a year. send_file answers
+# conditional and Range requests from the file's stat and hands the open file to the
+# server's wsgi.file_wrapper, which gunicorn sends with a zero-copy sendfile().
+# Behind a proxy the transfer can leave Python entirely: UPLOAD_ACCEL_REDIRECT=/prefix/
+# for nginx (an internal location aliased to the upload folder, with gzip_static)
+# or USE_X_SENDFILE=1 for Apache/lighttpd.
+UPLOAD_MAX_AGE = 365 * 24 * 3600
+
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_file(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+    # safe_join rejects absolute paths and '..'; dotfiles are unfinished uploads
+    filepath = safe_join(os.path.abspath(app.config['UPLOAD_FOLDER']), filename)
+    if filepath is None or any(part.startswith('.') for part in filename.split('/')) or not os.path.isfile(filepath):
+        return jsonify({'message': 'File not found!'}), 404
 
-# Initialize database on startup
-@app.before_request
-def before_request():
-    if not hasattr(app, 'first_request'):
-        init_db()
-        app.first_request = False  # `app` obyektida saqlaymiz
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    compressible = os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+    if app.config['UPLOAD_ACCEL_REDIRECT']:
+        response = app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = app.config['UPLOAD_ACCEL_REDIRECT'].rstrip('/') + '/' + filename
+    else:
+        encoding = None
+        if compressible:
+            for name, suffix in PRECOMPRESSED_ENCODINGS:
+                if request.accept_encodings[name] and os.path.isfile(filepath + suffix):
+                    encoding, filepath = name, filepath + suffix
+                    break
+        response = send_file(filepath, mimetype=mimetype, max_age=UPLOAD_MAX_AGE, conditional=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.cache_control.public = True
+    response.cache_control.max_age = UPLOAD_MAX_AGE
+    response.cache_control.immutable = True
+    if compressible:
+        response.vary.add('Accept-Encoding')
+    return response
+
+# Application entry point for WSGI servers: prepares the schema once, before
+# workers fork (see gunicorn.conf.py), then hands out the app.
+def create_app():
+    init_db()
+    return app
 
 
 if __name__ == '__main__':
+    create_app()
     # Make app available on local network
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,100 @@
+# Auth overhead per request under concurrent load: a bare route versus the same
+# route behind token_required with every token decoded (cache disabled) and with
+# the in-memory verified-token cache, plus /token/refresh throughput and the size
+# of the slimmed access token against the old long-lived one.
+#
+#   python benchmarks/bench_auth.py [threads] [requests]
+import datetime
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(tempfile.mkdtemp())
+
+import jwt
+from flask import jsonify
+import app as app_module
+
+app = app_module.app
+
+@app.route('/bench/open')
+def bench_open():
+    return jsonify({'ok': True})
+
+@app.route('/bench/auth')
+@app_module.token_required
+def bench_auth(current_user):
+    return jsonify({'ok': True})
+
+def run(path, threads, requests, headers=None):
+    per_thread = requests // threads
+
+    def worker():
+        client = app.test_client()
+        for _ in range(per_thread):
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200, response.data
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e6
+
+def run_refresh(client, refresh_token, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.post('/token/refresh', json={'refresh_token': refresh_token})
+        assert response.status_code == 200, response.data
+        refresh_token = response.json['refresh_token']
+    return requests / (time.perf_counter() - started)
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+
+    app.config['DATABASE'] = os.path.join(os.getcwd(), 'bench.db')
+    app_module.create_app()
+
+    client = app.test_client()
+    login = client.post('/login', json={'login': 'admin', 'password': 'admin123'}).json
+    headers = {'Authorization': f"Bearer {login['token']}"}
+
+    # The token format before the access/refresh split
+    old_token = jwt.encode({
+        'id': 1,
+        'login': 'admin',
+        'role': 'admin',
+        'gen': 0,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)
+    }, app.config['SECRET_KEY'], algorithm="HS256")
+
+    run('/bench/open', threads, 500)
+    bare = run('/bench/open', threads, requests)
+
+    cache = app_module.token_cache
+    app_module.token_cache = app_module.TTLCache(0, 0)
+    run('/bench/auth', threads, 500, headers)
+    decoded = run('/bench/auth', threads, requests, headers)
+
+    app_module.token_cache = cache
+    run('/bench/auth', threads, 500, headers)
+    cached = run('/bench/auth', threads, requests, headers)
+
+    refreshes = run_refresh(client, login['refresh_token'], min(requests, 2000))
+
+    print(f'threads={threads} requests={requests}')
+    print(f'token size: old {len(old_token)} bytes, access {len(login["token"])} bytes')
+    print(f'no auth:            {bare:8.1f} us/req')
+    print(f'jwt decode:         {decoded:8.1f} us/req (+{decoded - bare:.1f} us)')
+    print(f'cached token:       {cached:8.1f} us/req (+{cached - bare:.1f} us)')
+    print(f'/token/refresh:     {refreshes:8.1f} req/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# CPU cost versus bytes saved when compressing realistic /news and
+# /training-schedule pages, per encoding and level, plus end-to-end request cost
+# with compression done per request versus served from response_cache.
+#
+#   python benchmarks/bench_compression.py [page_size] [requests]
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(tempfile.mkdtemp())
+
+import sqlite3
+import app as app_module
+
+app = app_module.app
+brotli = app_module.brotli
+
+WORDS = (
+    "sport maktab musobaqa murabbiy talaba mashg‘ulot g‘alaba chempionat viloyat shahar "
+    "kurash dzyudo boks suzish futbol yengil atletika medal oltin kumush bronza jamoa "
+    "tayyorgarlik natija yil oy hafta kun ishtirok etdi o‘tkazildi tabriklaymiz yosh"
+).split()
+
+def seed(db_path):
+    rng = random.Random(1)
+    db = sqlite3.connect(db_path)
+    db.executemany("INSERT INTO sport_types (name, description) VALUES (?, ?)",
+                   ((name, 'Tavsif') for name in ('Kurash', 'Boks', 'Suzish', 'Futbol', 'Dzyudo')))
+    db.executemany(
+        "INSERT INTO coaches (first_name, last_name, login, password, sport_type_id) VALUES (?, ?, ?, ?, ?)",
+        ((f'Murabbiy{i}', f'Familiya{i}', f'coach{i}', 'x', i % 5 + 1) for i in range(20))
+    )
+    db.executemany(
+        "INSERT INTO news (title, content, date) VALUES (?, ?, ?)",
+        ((' '.join(rng.choices(WORDS, k=8)).capitalize(),
+          '\n\n'.join(' '.join(rng.choices(WORDS, k=rng.randint(40, 90))) + '.' for _ in range(rng.randint(3, 8))),
+          f'2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}') for i in range(500))
+    )
+    db.executemany(
+        "INSERT INTO training_schedule (date, time, sport_type_id, coach_id, room) VALUES (?, ?, ?, ?, ?)",
+        ((f'2024-03-{day:02d}', f'{hour:02d}:00', (day + hour) % 5 + 1, (day * hour) % 20 + 1, f'Zal {hour % 4 + 1}')
+         for day in range(1, 32) for hour in range(8, 20))
+    )
+    db.commit()
+    db.close()
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat * 1e6
+
+def codecs():
+    yield 'gzip-1', lambda body: gzip.compress(body, compresslevel=1, mtime=0)
+    yield f'gzip-{app_module.GZIP_LEVEL} (used)', lambda body: gzip.compress(body, compresslevel=app_module.GZIP_LEVEL, mtime=0)
+    yield 'gzip-9', lambda body: gzip.compress(body, compresslevel=9, mtime=0)
+    if brotli:
+        yield 'br-1', lambda body: brotli.compress(body, quality=1)
+        yield f'br-{app_module.BROTLI_QUALITY} (used)', lambda body: brotli.compress(body, quality=app_module.BROTLI_QUALITY)
+        yield 'br-11', lambda body: brotli.compress(body, quality=11)
+
+def run(client, path, headers, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.data
+    return (time.perf_counter() - started) / requests * 1e6
+
+def main():
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    app.config['DATABASE'] = os.path.join(os.getcwd(), 'bench.db')
+    app_module.create_app()
+    seed(app.config['DATABASE'])
+
+    client = app.test_client()
+    token = client.post('/login', json={'login': 'admin', 'password': 'admin123'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    paths = {
+        '/news': f'/news?limit={page_size}',
+        '/training-schedule': f'/training-schedule?from=2024-03-01&to=2024-03-31&limit={page_size * 4}'
+    }
+
+    for name, path in paths.items():
+        body = client.get(path, headers=headers).get_data()
+        print(f'{name}: {len(body)} bytes')
+        for codec, compress in codecs():
+            compressed, micros = timed(lambda: compress(body), 50)
+            saved = 1 - len(compressed) / len(body)
+            print(f'  {codec:16} {len(compressed):8} bytes  {saved:6.1%} saved  {micros:9.1f} us')
+
+    encoding = 'br' if brotli else 'gzip'
+    for name, path in paths.items():
+        plain = run(client, path, headers, requests)
+        cache = app_module.response_cache
+        # A cache that keeps nothing: every hit renders and compresses again
+        app_module.response_cache = app_module.TTLCache(0, 0)
+        uncached = run(client, path, {**headers, 'Accept-Encoding': encoding}, requests)
+        app_module.response_cache = cache
+        cached = run(client, path, {**headers, 'Accept-Encoding': encoding}, requests)
+        print(f'{name} per request: identity (cached) {plain:.1f} us, '
+              f'{encoding} uncached {uncached:.1f} us, {encoding} cached {cached:.1f} us')
+
+if __name__ == '__main__':
+    main()
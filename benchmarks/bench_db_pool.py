@@ -0,0 +1,75 @@
+# Requests/sec on GET /students/view with a fresh sqlite3.connect per request
+# (the old get_db) versus the pooled, PRAGMA-tuned connections.
+#
+#   python benchmarks/bench_db_pool.py [students] [requests]
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(tempfile.mkdtemp())
+
+import sqlite3
+from flask import g
+import app as app_module
+
+app = app_module.app
+
+def legacy_get_db(readonly=False):
+    db = getattr(g, '_legacy_database', None)
+    if db is None:
+        db = g._legacy_database = sqlite3.connect(app.config['DATABASE'])
+        db.row_factory = sqlite3.Row
+    return db
+
+@app.teardown_appcontext
+def close_legacy_connection(exception):
+    db = g.pop('_legacy_database', None)
+    if db is not None:
+        db.close()
+
+def seed(count):
+    db = sqlite3.connect(app.config['DATABASE'])
+    db.executemany(
+        "INSERT INTO students (first_name, last_name, phone, login, password) VALUES (?, ?, ?, ?, ?)",
+        ((f'First{i}', f'Last{i}', f'+99890{i:07d}', f'student{i}', 'x') for i in range(count))
+    )
+    db.commit()
+    db.close()
+
+def run(client, headers, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/students/view?limit=50', headers=headers)
+        assert response.status_code == 200
+    return requests / (time.perf_counter() - started)
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    app.config['DATABASE'] = os.path.join(os.getcwd(), 'bench.db')
+    app_module.init_db()
+    seed(students)
+
+    client = app.test_client()
+    token = client.post('/login', json={'login': 'admin', 'password': 'admin123'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    pooled_get_db = app_module.get_db
+    app_module.get_db = legacy_get_db
+    run(client, headers, 100)
+    before = run(client, headers, requests)
+
+    app_module.get_db = pooled_get_db
+    run(client, headers, 100)
+    after = run(client, headers, requests)
+
+    print(f'students={students} requests={requests}')
+    print(f'per-request connect: {before:8.1f} req/s')
+    print(f'pooled connection:   {after:8.1f} req/s ({after / before:.2f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# MB/s served by a single gunicorn sync worker from GET /uploads (send_file handing
+# the file to wsgi.file_wrapper, i.e. sendfile) versus the same file streamed
+# through Python in chunks, plus 1 MB Range requests.
+#
+#   python benchmarks/bench_uploads.py [file_mb] [requests]
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, '..')
+
+# Gunicorn entry point: the real app plus a route that reads the file in Python
+def bench_app():
+    from flask import Response
+    import app as app_module
+
+    app = app_module.app
+    app.config['UPLOAD_FOLDER'] = os.path.abspath('uploads')
+
+    @app.route('/python-uploads/<path:filename>')
+    def python_uploaded_file(filename):
+        def chunks():
+            with open(os.path.join(app.config['UPLOAD_FOLDER'], filename), 'rb') as f:
+                while True:
+                    chunk = f.read(64 * 1024)
+                    if not chunk:
+                        return
+                    yield chunk
+        return Response(chunks(), mimetype='application/octet-stream')
+
+    return app_module.create_app()
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start')
+
+def run(port, path, requests, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    received = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        assert response.status in (200, 206), (response.status, body[:200])
+        received += len(body)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return received / elapsed / 1024 / 1024
+
+def main():
+    file_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    work = tempfile.mkdtemp()
+    os.makedirs(os.path.join(work, 'uploads', 'blobs', 'ab'))
+    name = 'blobs/ab/bench.bin'
+    with open(os.path.join(work, 'uploads', name), 'wb') as f:
+        f.write(os.urandom(file_mb * 1024 * 1024))
+
+    port = free_port()
+    env = dict(os.environ, SECRET_KEY='benchmark', PYTHONPATH=os.pathsep.join([BENCH_DIR, ROOT]))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', '1', '-k', 'sync', '-b', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'bench_uploads:bench_app()'],
+        cwd=work, env=env
+    )
+    try:
+        wait_for(port)
+        run(port, f'/uploads/{name}', 2)
+        print(f"{file_mb} MB file, {requests} requests, 1 worker")
+        print(f"  python chunks    {run(port, f'/python-uploads/{name}', requests):8.1f} MB/s")
+        print(f"  /uploads         {run(port, f'/uploads/{name}', requests):8.1f} MB/s")
+        print(f"  /uploads 1MB Range {run(port, f'/uploads/{name}', requests * file_mb, {'Range': 'bytes=0-1048575'}):6.1f} MB/s")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == '__main__':
+    main()
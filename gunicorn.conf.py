@@ -0,0 +1,18 @@
+# gunicorn -c gunicorn.conf.py
+# The app is loaded (and the schema migrated) once in the master process,
+# so workers start with a ready database and never race on DDL.
+import os
+
+wsgi_app = 'app:create_app()'
+preload_app = True
+bind = '0.0.0.0:5000'
+
+# Threaded workers: a request waiting on the password hashing pool (or on SQLite)
+# only parks its own thread, the worker keeps serving other requests meanwhile.
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# Every worker has its own hashing pool; split the CPUs between them instead of
+# giving each worker one process per CPU. Read by app.py when it is preloaded.
+os.environ.setdefault('HASH_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
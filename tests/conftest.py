@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as sports_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    flask_app = sports_app.app
+    config = dict(flask_app.config)
+    flask_app.config.update(
+        TESTING=True,
+        SECRET_KEY='test-secret',
+        DATABASE=str(tmp_path / 'sports_school.db'),
+        UPLOAD_FOLDER=str(tmp_path / 'uploads')
+    )
+    os.makedirs(os.path.join(flask_app.config['UPLOAD_FOLDER'], sports_app.BLOB_FOLDER))
+    # Jobs stay queued; tests run them explicitly if they need to
+    sports_app.job_state['pid'] = os.getpid()
+    # Caches are process-wide and keyed by versions that restart with every database
+    sports_app.response_cache.clear()
+    sports_app.token_cache.clear()
+    sports_app.credential_cache.clear()
+    sports_app.token_generations_state.update(generations={}, version=None, checked_at=0.0)
+    sports_app.init_db()
+    yield flask_app
+    flask_app.config.clear()
+    flask_app.config.update(config)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        yield sports_app.get_db()
+
+
+@pytest.fixture
+def admin_headers(app):
+    # Not tied to the db fixture: while its app context is open, requests share it and
+    # skip the teardown that rolls back a rejected write
+    with app.app_context():
+        db = sports_app.get_db()
+        token = sports_app.issue_token(db.cursor(), 1, 'admin')
+        db.commit()
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+import app as sports_app
+
+
+@pytest.fixture
+def student(client, admin_headers):
+    response = client.post('/students', headers=admin_headers, json={
+        'first_name': 'Ali', 'last_name': 'Valiyev', 'login': 'ali', 'password': 'secret'
+    })
+    assert response.status_code == 200
+    tokens = client.post('/login', json={'login': 'ali', 'password': 'secret'}).get_json()
+    return {'id': response.get_json()['id'], **tokens}
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_password_change_revokes_older_tokens(client, student):
+    assert client.get('/profile', headers=bearer(student['token'])).status_code == 200
+
+    response = client.put('/profile/update-password', headers=bearer(student['token']), json={
+        'current_password': 'secret', 'new_password': 'changed'
+    })
+    assert response.status_code == 200
+    assert client.get('/profile', headers=bearer(student['token'])).status_code == 401
+    assert client.get('/profile', headers=bearer(response.get_json()['token'])).status_code == 200
+    assert client.post('/token/refresh', json={'refresh_token': student['refresh_token']}).status_code == 401
+
+
+def test_admin_password_reset_revokes_tokens(client, admin_headers, student):
+    assert client.get('/profile', headers=bearer(student['token'])).status_code == 200
+    response = client.put(f"/students/{student['id']}", headers=admin_headers, json={'password': 'reset'})
+    assert response.status_code == 200
+    assert client.get('/profile', headers=bearer(student['token'])).status_code == 401
+
+
+def test_deleting_a_user_revokes_tokens(client, admin_headers, student):
+    assert client.get('/profile', headers=bearer(student['token'])).status_code == 200
+    assert client.delete(f"/students/{student['id']}", headers=admin_headers).status_code == 200
+    assert client.get('/profile', headers=bearer(student['token'])).status_code == 401
+
+
+def test_refresh_rotates_the_token(client, student):
+    response = client.post('/token/refresh', json={'refresh_token': student['refresh_token']})
+    assert response.status_code == 200
+    tokens = response.get_json()
+    assert tokens['refresh_token'] != student['refresh_token']
+    assert client.get('/profile', headers=bearer(tokens['token'])).status_code == 200
+    assert client.post('/token/refresh', json={'refresh_token': tokens['refresh_token']}).status_code == 200
+
+
+def test_reusing_a_spent_refresh_token_revokes_its_family(client, student):
+    rotated = client.post('/token/refresh', json={'refresh_token': student['refresh_token']}).get_json()
+    other_login = client.post('/login', json={'login': 'ali', 'password': 'secret'}).get_json()
+
+    reused = client.post('/token/refresh', json={'refresh_token': student['refresh_token']})
+    assert reused.status_code == 401
+    assert reused.get_json()['message'] == 'Refresh token has been revoked!'
+    # The chain that leaked is gone, other logins are not
+    assert client.post('/token/refresh', json={'refresh_token': rotated['refresh_token']}).status_code == 401
+    assert client.post('/token/refresh', json={'refresh_token': other_login['refresh_token']}).status_code == 200
+
+
+def test_expired_refresh_token_is_rejected(app, client, student):
+    with app.app_context():
+        db = sports_app.get_db()
+        db.execute("UPDATE refresh_tokens SET expires_at = ?", (time.time() - 1,))
+        db.commit()
+    response = client.post('/token/refresh', json={'refresh_token': student['refresh_token']})
+    assert response.status_code == 401
+    assert response.get_json()['message'] == 'Refresh token is invalid!'
+
+
+def test_unknown_or_missing_refresh_token(client):
+    assert client.post('/token/refresh', json={'refresh_token': 'nope'}).status_code == 401
+    assert client.post('/token/refresh', json={}).status_code == 400
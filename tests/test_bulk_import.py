@@ -0,0 +1,67 @@
+import json
+
+import app as sports_app
+
+
+def jsonl(*rows):
+    return '\n'.join(json.dumps(row) for row in rows)
+
+
+def test_rejects_non_string_values(client, admin_headers):
+    body = jsonl(
+        {'first_name': 42, 'last_name': 'Karimov'},
+        {'full_name': ['Aziz', 'Karimov']},
+        {'first_name': 'Aziz', 'last_name': None, 'login': None, 'password': None}
+    )
+    response = client.post('/coaches/bulk', headers=admin_headers, data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.json['imported'] == 1
+    assert [(error['row'], error['message']) for error in response.json['errors']] == [
+        (1, 'Invalid first_name!'), (2, 'Invalid full_name!')
+    ]
+
+
+def test_login_taken_during_import_is_reported(client, db, admin_headers, monkeypatch):
+    # Simulate another request inserting a login after the batch checked it
+    hash_passwords = sports_app.hash_passwords
+
+    def racing_hash_passwords(passwords):
+        other = sports_app.connect_db()
+        other.execute("INSERT INTO students (first_name, last_name, login, password) VALUES ('X', 'Y', 'vali', 'x')")
+        other.commit()
+        other.close()
+        return hash_passwords(passwords)
+
+    monkeypatch.setattr(sports_app, 'hash_passwords', racing_hash_passwords)
+    body = jsonl(
+        {'first_name': 'Ali', 'last_name': 'Valiyev', 'login': 'ali', 'password': 'secret'},
+        {'first_name': 'Vali', 'last_name': 'Aliyev', 'login': 'vali', 'password': 'secret'}
+    )
+    response = client.post('/students/bulk', headers=admin_headers, data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.json['imported'] == 1
+    assert response.json['errors'] == [{'row': 2, 'login': 'vali', 'message': 'Login already exists!'}]
+    assert db.execute("SELECT COUNT(*) FROM students").fetchone()[0] == 2
+
+
+def test_busy_hashing_pool_reports_the_partial_import(client, db, admin_headers, monkeypatch):
+    hash_passwords = sports_app.hash_passwords
+    calls = []
+
+    def busy_after_first_batch(passwords):
+        calls.append(passwords)
+        if len(calls) > 1:
+            raise sports_app.HashingBusy()
+        return hash_passwords(passwords)
+
+    monkeypatch.setattr(sports_app, 'hash_passwords', busy_after_first_batch)
+    monkeypatch.setattr(sports_app, 'IMPORT_BATCH_SIZE', 2)
+    body = jsonl(*[
+        {'first_name': 'Ali', 'last_name': 'Valiyev', 'login': f'ali{n}', 'password': 'secret'} for n in range(5)
+    ])
+    response = client.post('/students/bulk', headers=admin_headers, data=body, content_type='application/x-ndjson')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.json['imported'] == 2
+    assert response.json['resume_row'] == 3
+    assert db.execute("SELECT COUNT(*) FROM students WHERE login LIKE 'ali%'").fetchone()[0] == 2
@@ -0,0 +1,71 @@
+import datetime
+
+import app as sports_app
+
+
+def set_news_updated_at(app, updated_at):
+    with app.app_context():
+        db = sports_app.get_db()
+        sports_app.bump_versions(db.cursor(), 'news')
+        db.execute("UPDATE collection_versions SET updated_at = ? WHERE name = 'news'", (updated_at,))
+        db.commit()
+
+
+def test_unchanged_list_is_a_304(app, client, admin_headers):
+    set_news_updated_at(app, '2020-01-01 00:00:00')
+    response = client.get('/news', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers['Last-Modified'] == 'Wed, 01 Jan 2020 00:00:00 GMT'
+
+    by_etag = client.get('/news', headers=dict(admin_headers, **{'If-None-Match': response.headers['ETag']}))
+    assert by_etag.status_code == 304
+    assert by_etag.headers['ETag'] == response.headers['ETag']
+    by_date = client.get('/news', headers=dict(admin_headers, **{'If-Modified-Since': response.headers['Last-Modified']}))
+    assert by_date.status_code == 304
+
+
+def test_write_makes_validators_stale(app, client, admin_headers):
+    set_news_updated_at(app, '2020-01-01 00:00:00')
+    response = client.get('/news', headers=admin_headers)
+
+    with app.app_context():
+        db = sports_app.get_db()
+        sports_app.bump_versions(db.cursor(), 'news')
+        db.commit()
+    for name, value in (('If-None-Match', response.headers['ETag']), ('If-Modified-Since', response.headers['Last-Modified'])):
+        assert client.get('/news', headers=dict(admin_headers, **{name: value})).status_code == 200
+
+
+def test_no_last_modified_within_the_second_of_a_write(app, client, admin_headers):
+    # A second write in the same second would keep updated_at, so a date validator
+    # handed out now could later match a changed list. Stamped a little ahead, so
+    # the test can't straddle a second boundary.
+    written = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=5)
+    set_news_updated_at(app, written.strftime('%Y-%m-%d %H:%M:%S'))
+
+    response = client.get('/news', headers=admin_headers)
+    assert 'Last-Modified' not in response.headers
+    since = written.strftime('%a, %d %b %Y %H:%M:%S GMT')
+    assert client.get('/news', headers=dict(admin_headers, **{'If-Modified-Since': since})).status_code == 200
+
+
+def test_compressed_responses_revalidate_by_their_suffixed_etag(app, client, admin_headers):
+    with app.app_context():
+        db = sports_app.get_db()
+        db.executemany("INSERT INTO news (title, content, date) VALUES (?, ?, '2026-01-01')",
+                       [(f'News {number}', 'Body ' * 20) for number in range(20)])
+        sports_app.bump_versions(db.cursor(), 'news')
+        db.commit()
+    plain_etag = client.get('/news', headers=admin_headers).headers['ETag']
+
+    # brotli is optional; without it only gzip is offered
+    for encoding in ('gzip',) if sports_app.brotli is None else ('br', 'gzip'):
+        headers = dict(admin_headers, **{'Accept-Encoding': encoding})
+        response = client.get('/news', headers=headers)
+        assert response.headers['Content-Encoding'] == encoding
+        assert response.headers['ETag'] == plain_etag[:-1] + f'-{encoding}"'
+
+        revalidated = client.get('/news', headers=dict(headers, **{'If-None-Match': response.headers['ETag']}))
+        assert revalidated.status_code == 304
+        assert revalidated.headers['ETag'] == response.headers['ETag']
+        assert 'Content-Encoding' not in revalidated.headers
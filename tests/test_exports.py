@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+
+import pytest
+
+import app as sports_app
+
+STUDENTS = [('Ali', 'Valiyev', 'ali'), ('Vali', 'Aliyev', 'vali'), ('Aziz', 'Karimov', 'aziz')]
+
+
+@pytest.fixture
+def students(app, monkeypatch):
+    with app.app_context():
+        db = sports_app.get_db()
+        db.executemany("INSERT INTO students (first_name, last_name, login, password) VALUES (?, ?, ?, 'x')", STUDENTS)
+        sports_app.bump_versions(db.cursor(), 'students')
+        db.commit()
+    # Several fetchmany batches even for a few rows
+    monkeypatch.setattr(sports_app, 'EXPORT_BATCH_SIZE', 2)
+    return [{'first_name': first, 'login': login} for first, _, login in STUDENTS]
+
+
+def export(client, headers, accept, query='?fields=first_name,login'):
+    return client.get(f'/students/export{query}', headers=dict(headers, Accept=accept))
+
+
+def test_json_export(client, admin_headers, students):
+    response = export(client, admin_headers, 'application/json')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert response.is_streamed
+    assert json.loads(response.data) == students
+
+
+def test_ndjson_export(client, admin_headers, students):
+    response = export(client, admin_headers, 'application/x-ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.data.decode().splitlines()] == students
+
+
+def test_csv_export(client, admin_headers, students):
+    response = export(client, admin_headers, 'text/csv')
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=students.csv'
+    assert list(csv.DictReader(io.StringIO(response.data.decode()))) == students
+
+
+def test_export_formats_are_cached_apart(client, admin_headers, students):
+    # Each stream is drained before the next request, so request contexts close in order
+    as_json = export(client, admin_headers, 'application/json')
+    assert as_json.data
+    as_csv = export(client, admin_headers, 'text/csv')
+    assert as_csv.data
+    assert as_json.headers['ETag'] != as_csv.headers['ETag']
+    assert 'Accept' in as_csv.headers['Vary']
+
+
+def test_export_without_fields_has_every_column(client, admin_headers, students):
+    rows = json.loads(export(client, admin_headers, 'application/json', query='').data)
+    assert set(rows[0]) == set(sports_app.STUDENT_FIELDS)
+
+
+def test_export_rejects_unknown_fields(client, admin_headers, students):
+    response = export(client, admin_headers, 'text/csv', query='?fields=first_name,password')
+    assert response.status_code == 400
+    assert response.get_json() == {'message': 'Unknown field: password!'}
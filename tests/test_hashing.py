@@ -0,0 +1,50 @@
+import os
+import time
+
+import pytest
+
+import app as sports_app
+
+
+@pytest.fixture
+def hashing_pool(app):
+    app.config.update(HASH_WORKERS=1, HASH_QUEUE_SIZE=1, HASH_TIMEOUT=0.05)
+    sports_app.hashing_state['pid'] = None
+    yield
+    sports_app.hashing_state['pool'].shutdown(wait=True)
+    sports_app.hashing_state['pid'] = None
+
+
+def test_timed_out_job_keeps_its_slot(hashing_pool):
+    with pytest.raises(sports_app.HashingBusy):
+        sports_app.run_hashing(time.sleep, 0.5)
+    assert sports_app.hashing_metrics['in_flight'] == 1
+
+    # Still running in the pool, so the single slot is taken
+    rejected = sports_app.hashing_metrics['rejected']
+    with pytest.raises(sports_app.HashingBusy):
+        sports_app.run_hashing(time.sleep, 0)
+    assert sports_app.hashing_metrics['rejected'] == rejected + 1
+
+    deadline = time.monotonic() + 5
+    while sports_app.hashing_metrics['in_flight'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert sports_app.hashing_metrics['in_flight'] == 0
+    assert sports_app.run_hashing(abs, -3) == 3
+
+
+def test_hash_timeout_is_a_503(app, client, db, hashing_pool, monkeypatch):
+    monkeypatch.setattr(sports_app, 'hash_password', lambda password: sports_app.run_hashing(time.sleep, 0.5))
+    token = sports_app.issue_token(db.cursor(), 1, 'admin')
+    response = client.post(
+        '/students', headers={'Authorization': f'Bearer {token}'},
+        json={'first_name': 'Ali', 'last_name': 'Valiyev', 'login': 'ali', 'password': 'secret'}
+    )
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_pool_processes_are_not_forked_from_the_worker(hashing_pool, app):
+    # Forked children would be ours; forkserver and spawn children are not
+    app.config['HASH_TIMEOUT'] = 30
+    assert sports_app.run_hashing(os.getppid) != os.getpid()
@@ -0,0 +1,26 @@
+import sqlite3
+
+import app as sports_app
+
+
+def test_worker_survives_database_errors_while_recording_a_job(app, db, monkeypatch):
+    cursor = db.cursor()
+    for path in ('news/a.txt', 'news/b.txt'):
+        sports_app.enqueue_job(cursor, 'delete_file', {'path': path}, f'delete_file:{path}')
+    db.commit()
+
+    run_job = sports_app.run_job
+    calls = []
+
+    def locked_once(db, job):
+        calls.append(job['id'])
+        if len(calls) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        run_job(db, job)
+
+    monkeypatch.setattr(sports_app, 'run_job', locked_once)
+    sports_app.work_jobs('test-worker')
+
+    statuses = dict(db.execute("SELECT id, status FROM jobs ORDER BY id").fetchall())
+    assert calls == [1, 2]
+    assert statuses == {1: 'running', 2: 'done'}
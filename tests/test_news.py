@@ -0,0 +1,55 @@
+import app as sports_app
+
+
+def add_news(db, count, images_per_item=3):
+    cursor = db.cursor()
+    for number in range(count):
+        cursor.execute(
+            "INSERT INTO news (title, content, date) VALUES (?, ?, ?)",
+            (f'News {number}', 'Body', f'2026-01-{number % 28 + 1:02d}')
+        )
+        news_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO news_images (news_id, image_path) VALUES (?, ?)",
+            [(news_id, f'news/{news_id}-{image}.jpg') for image in range(images_per_item)]
+        )
+    sports_app.bump_versions(cursor, 'news')
+    db.commit()
+
+
+# Version and token bookkeeping run on every authenticated GET, whatever the route
+BOOKKEEPING_TABLES = ('collection_versions', 'token_generations')
+
+
+def news_statements(client, headers, query):
+    statements = []
+    sports_app.get_db(readonly=True).set_trace_callback(statements.append)
+    try:
+        response = client.get(f'/news{query}', headers=headers)
+    finally:
+        sports_app.get_db(readonly=True).set_trace_callback(None)
+    assert response.status_code == 200
+    return response, [statement for statement in statements
+                      if not any(table in statement for table in BOOKKEEPING_TABLES)]
+
+
+def test_news_page_runs_fixed_number_of_statements(client, db, admin_headers):
+    add_news(db, 2)
+    response, small_page = news_statements(client, admin_headers, '?limit=50')
+    assert len(response.json['items']) == 2
+
+    add_news(db, 40)
+    response, large_page = news_statements(client, admin_headers, '?limit=50')
+    assert len(response.json['items']) == 42
+    assert all(len(item['images']) == 3 for item in response.json['items'])
+
+    # news page, its images, their variants: no per-article queries
+    assert len(small_page) == len(large_page) == 3
+    assert sum('news_images' in statement for statement in large_page) == 1
+
+
+def test_news_without_images_skips_image_query(client, db, admin_headers):
+    add_news(db, 5)
+    response, statements = news_statements(client, admin_headers, '?fields=id,title')
+    assert [set(item) for item in response.json] == [{'id', 'title'}] * 5
+    assert not any('news_images' in statement for statement in statements)
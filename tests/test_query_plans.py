@@ -0,0 +1,105 @@
+import app as sports_app
+
+# Version and token bookkeeping run on every authenticated request, whatever the route
+BOOKKEEPING_TABLES = ('collection_versions', 'token_generations')
+# Series are recurrence definitions, a handful of rows however long the history;
+# range reads expand all of them that overlap the window
+DEFINITION_TABLES = ('FROM training_series ',)
+
+
+def seed(db):
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO sport_types (name) VALUES ('Boxing')")
+    cursor.execute("INSERT INTO coaches (first_name, last_name, sport_type_id, login, password) VALUES ('Aziz', 'Karimov', 1, 'aziz', 'x')")
+    for day in range(1, 11):
+        cursor.execute("INSERT INTO news (title, content, date) VALUES ('News', 'Body', ?)", (f'2026-01-{day:02d}',))
+        cursor.execute("INSERT INTO news_images (news_id, image_path) VALUES (?, 'news/a.jpg')", (cursor.lastrowid,))
+        cursor.execute("INSERT INTO results (competition_name, date) VALUES ('Cup', ?)", (f'2026-01-{day:02d}',))
+        cursor.execute(
+            "INSERT INTO training_schedule (date, time, sport_type_id, coach_id, room) VALUES (?, '10:00', 1, 1, 'R1')",
+            (f'2026-01-{day:02d}',)
+        )
+    db.commit()
+
+
+def traced(connection, call):
+    statements = []
+    connection.set_trace_callback(statements.append)
+    try:
+        response = call()
+    finally:
+        connection.set_trace_callback(None)
+    assert response.status_code == 200, response.data
+    return [statement for statement in statements
+            if statement.lstrip().upper().startswith(('SELECT', 'INSERT', 'UPDATE', 'DELETE'))
+            and not any(table in statement for table in BOOKKEEPING_TABLES)]
+
+
+def full_scans(db, statements):
+    # A plan step "SCAN <table>" without "USING ... INDEX" reads the whole table.
+    # Scanning a view's co-routine only reads the rows its own (indexed) steps produced.
+    scans = []
+    for statement in statements:
+        if any(table in statement for table in DEFINITION_TABLES):
+            continue
+        plan = [row['detail'] for row in db.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()]
+        subqueries = {detail.split()[1] for detail in plan if detail.startswith(('CO-ROUTINE', 'MATERIALIZE'))}
+        for detail in plan:
+            if (detail.startswith('SCAN') and 'INDEX' not in detail and 'CONSTANT ROW' not in detail
+                    and detail.split()[1] not in subqueries):
+                scans.append((statement, detail))
+    return scans
+
+
+def test_hot_read_queries_use_indexes(client, db, admin_headers):
+    seed(db)
+    reader = sports_app.get_db(readonly=True)
+    paths = [
+        '/news?limit=5',
+        '/news?limit=5&after_date=2026-01-06&after_id=6',
+        '/results?limit=5',
+        '/results?limit=5&after_date=2026-01-06&after_id=6',
+        '/training-schedule?limit=5',
+        '/training-schedule?limit=5&after_date=2026-01-03&after_time=10:00&after_id=3',
+        '/training-schedule?from=2026-01-02&to=2026-01-05&coach_id=1',
+        '/training-schedule?from=2026-01-02&to=2026-01-05&sport_type_id=1'
+    ]
+    for path in paths:
+        statements = traced(reader, lambda: client.get(path, headers=admin_headers))
+        assert statements, path
+        assert full_scans(reader, statements) == [], path
+
+
+def test_range_merges_series_occurrences(client, db, admin_headers):
+    seed(db)
+    db.execute("INSERT INTO training_series (start_date, end_date, weekdays, time, sport_type_id, coach_id, room) "
+               "VALUES ('2026-01-01', '2026-01-31', '0', '09:00', 1, 1, 'R2')")
+    db.commit()
+    response = client.get('/training-schedule?from=2026-01-05&to=2026-01-12', headers=admin_headers)
+    assert response.status_code == 200
+    items = response.get_json()
+    assert [(item['date'], item['time']) for item in items if item['series_id']] == [
+        ('2026-01-05', '09:00'), ('2026-01-12', '09:00')
+    ]
+    assert len(items) == 8
+
+    first = client.get('/training-schedule?from=2026-01-05&to=2026-01-12&limit=1', headers=admin_headers).get_json()
+    assert first['items'][0]['series_id'] and first['next_cursor'] == {
+        'after_date': '2026-01-05', 'after_time': '09:00', 'after_series_id': first['items'][0]['series_id']
+    }
+    pages = first['items']
+    cursor = first['next_cursor']
+    while cursor:
+        query = '&'.join(f'{key}={value}' for key, value in cursor.items())
+        page = client.get(f'/training-schedule?from=2026-01-05&to=2026-01-12&limit=3&{query}', headers=admin_headers).get_json()
+        pages += page['items']
+        cursor = page['next_cursor']
+    assert pages == items
+
+    assert client.get('/training-schedule?from=2026-01-12&to=2026-01-05', headers=admin_headers).status_code == 400
+
+
+def test_login_queries_use_indexes(client, db):
+    statements = traced(db, lambda: client.post('/login', json={'login': 'admin', 'password': 'admin123'}))
+    assert any('accounts' in statement for statement in statements)
+    assert full_scans(db, statements) == []
@@ -0,0 +1,151 @@
+import json
+
+import app as sports_app
+
+
+def add_session(client, headers, **values):
+    response = client.post('/training-schedule', json=dict({'room': 'R1', 'duration': 60}, **values), headers=headers)
+    assert response.status_code == 200, response.data
+    return response.get_json()['id']
+
+
+def test_series_are_checked_for_conflicts_over_their_span(client, admin_headers):
+    add_session(client, admin_headers, date='2030-02-25', time='10:00')
+    series = {'weekdays': [0], 'time': '10:30', 'room': 'R1', 'start_date': '2030-01-07', 'end_date': '2030-02-28'}
+
+    response = client.post('/training-series', json=series, headers=admin_headers)
+    assert response.status_code == 409
+    assert [conflict['session']['date'] for conflict in response.get_json()['conflicts']] == ['2030-02-25']
+
+    response = client.post('/training-series', json=dict(series, time='12:00'), headers=admin_headers)
+    assert response.status_code == 200
+    series_id = response.get_json()['id']
+
+    # Overlapping its own current occurrences is fine, moving onto the session is not
+    update = client.put(f'/training-series/{series_id}', json={'time': '12:30'}, headers=admin_headers)
+    assert update.status_code == 200
+    update = client.put(f'/training-series/{series_id}', json={'time': '10:15'}, headers=admin_headers)
+    assert update.status_code == 409
+
+    # Unless that occurrence was moved away first
+    override = client.put(
+        f'/training-series/{series_id}/occurrences/2030-02-25', json={'time': '15:00'}, headers=admin_headers
+    )
+    assert override.status_code == 200
+    update = client.put(f'/training-series/{series_id}', json={'time': '10:15'}, headers=admin_headers)
+    assert update.status_code == 200
+
+
+def test_open_ended_series_are_checked_ahead(client, admin_headers):
+    add_session(client, admin_headers, date='2030-06-03', time='09:00')
+    series = {'weekdays': [0, 2], 'time': '09:30', 'room': 'R1', 'start_date': '2030-01-07'}
+    assert client.post('/training-series', json=series, headers=admin_headers).status_code == 409
+    assert client.post('/training-series', json=dict(series, room='R2'), headers=admin_headers).status_code == 200
+
+
+def test_batch_rejects_deleting_an_override_whose_occurrence_would_clash(client, admin_headers):
+    series = {'weekdays': [0], 'time': '12:00', 'room': 'R1', 'start_date': '2030-01-07', 'end_date': '2030-01-31'}
+    series_id = client.post('/training-series', json=series, headers=admin_headers).get_json()['id']
+    override_id = client.put(
+        f'/training-series/{series_id}/occurrences/2030-01-14', json={'time': '14:00'}, headers=admin_headers
+    ).get_json()['id']
+    add_session(client, admin_headers, date='2030-01-14', time='12:30')
+
+    response = client.post('/training-schedule/batch', json={'operations': [
+        {'op': 'create', 'date': '2030-01-15', 'time': '08:00', 'room': 'R1'},
+        {'op': 'delete', 'id': override_id}
+    ]}, headers=admin_headers)
+    assert response.status_code == 409
+    created, deleted = response.get_json()['results']
+    assert created == {'index': 0, 'op': 'create', 'status': 'ok'}
+    assert deleted['status'] == 'error' and deleted['conflicts'][0]['session']['time'] == '12:30'
+
+    conflicts = client.get('/training-schedule/conflicts?from=2030-01-07&to=2030-01-31', headers=admin_headers)
+    assert conflicts.get_json()['items'] == []
+    schedule = client.get('/training-schedule?from=2030-01-14&to=2030-01-15', headers=admin_headers).get_json()
+    assert [(item['date'], item['time']) for item in schedule] == [('2030-01-14', '12:30'), ('2030-01-14', '14:00')]
+
+
+def test_batch_checks_the_state_after_all_operations(client, admin_headers):
+    first = add_session(client, admin_headers, date='2030-01-14', time='10:00')
+    second = add_session(client, admin_headers, date='2030-01-14', time='11:00')
+
+    response = client.post('/training-schedule/batch', json={'operations': [
+        {'op': 'update', 'id': first, 'time': '11:00'},
+        {'op': 'update', 'id': second, 'time': '10:00'},
+        {'op': 'create', 'date': '2030-01-14', 'time': '12:00', 'room': 'R1'}
+    ]}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['results'][2]['id'] == second + 1
+
+
+def test_schedule_and_series_lists_project_fields(client, admin_headers):
+    add_session(client, admin_headers, date='2030-01-14', time='10:00')
+    series = {'weekdays': [1], 'time': '12:00', 'room': 'R1', 'start_date': '2030-01-07', 'end_date': '2030-01-31'}
+    client.post('/training-series', json=series, headers=admin_headers)
+
+    stored = client.get('/training-schedule?fields=date,time', headers=admin_headers).get_json()
+    assert stored == [{'date': '2030-01-14', 'time': '10:00'}]
+    merged = client.get('/training-schedule?from=2030-01-14&to=2030-01-15&fields=time,room&limit=1', headers=admin_headers)
+    assert merged.get_json()['items'] == [{'time': '10:00', 'room': 'R1'}]
+    assert merged.get_json()['next_cursor']['after_id']
+    assert client.get('/training-series?fields=weekdays', headers=admin_headers).get_json() == [{'weekdays': [1]}]
+    assert client.get('/training-series?fields=nope', headers=admin_headers).status_code == 400
+
+
+def test_batch_reports_malformed_ids_per_operation(client, admin_headers):
+    session_id = add_session(client, admin_headers, date='2030-01-14', time='10:00')
+    response = client.post('/training-schedule/batch', json={'operations': [
+        {'op': 'delete', 'id': [session_id]},
+        {'op': 'update', 'id': True, 'time': '11:00'},
+        {'op': 'delete', 'id': session_id}
+    ]}, headers=admin_headers)
+    assert response.status_code == 400
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['error', 'error', 'ok']
+    assert results[0]['message'] == 'id must be an integer!'
+    # Nothing was changed, and the lock was released with the request
+    assert client.post('/training-schedule/batch', json={'operations': [{'op': 'delete', 'id': session_id}]},
+                       headers=admin_headers).status_code == 200
+
+
+def stored_week(app, week_start):
+    with app.app_context():
+        row = sports_app.get_db().execute(
+            "SELECT sessions FROM schedule_weeks WHERE week_start = ?", (week_start,)
+        ).fetchone()
+    return None if row is None else [(item['date'], item['time']) for item in json.loads(row['sessions'])]
+
+
+def week_view(client, headers, date):
+    items = client.get(f'/training-schedule/week?date={date}', headers=headers).get_json()['items']
+    return [(item['date'], item['time']) for item in items]
+
+
+def test_week_views_follow_schedule_series_and_override_writes(app, client, admin_headers):
+    series = {'weekdays': [0], 'time': '12:00', 'room': 'R1', 'start_date': '2030-01-07', 'end_date': '2030-01-31'}
+    series_id = client.post('/training-series', json=series, headers=admin_headers).get_json()['id']
+    # Weeks nothing was stored for yet are expanded on read
+    assert stored_week(app, '2030-01-14') is None
+    assert week_view(client, admin_headers, '2030-01-16') == [('2030-01-14', '12:00')]
+
+    session_id = add_session(client, admin_headers, date='2030-01-15', time='09:00')
+    assert stored_week(app, '2030-01-14') == [('2030-01-14', '12:00'), ('2030-01-15', '09:00')]
+
+    override = client.put(f'/training-series/{series_id}/occurrences/2030-01-14', json={'time': '15:00'},
+                          headers=admin_headers)
+    assert override.status_code == 200
+    assert stored_week(app, '2030-01-14') == [('2030-01-14', '15:00'), ('2030-01-15', '09:00')]
+    assert week_view(client, admin_headers, '2030-01-16') == [('2030-01-14', '15:00'), ('2030-01-15', '09:00')]
+
+    # Editing the override again, and moving it into the next week
+    client.put(f'/training-series/{series_id}/occurrences/2030-01-14', json={'date': '2030-01-22'},
+               headers=admin_headers)
+    assert stored_week(app, '2030-01-14') == [('2030-01-15', '09:00')]
+    assert week_view(client, admin_headers, '2030-01-21') == [('2030-01-21', '12:00'), ('2030-01-22', '15:00')]
+
+    client.put(f'/training-series/{series_id}', json={'time': '18:00'}, headers=admin_headers)
+    assert stored_week(app, '2030-01-21') == [('2030-01-21', '18:00'), ('2030-01-22', '15:00')]
+    assert client.delete(f'/training-schedule/{session_id}', headers=admin_headers).status_code == 200
+    assert stored_week(app, '2030-01-14') is None
+    assert week_view(client, admin_headers, '2030-01-16') == []
@@ -0,0 +1,32 @@
+import app as sports_app
+
+
+def test_student_search_matches_phone_fragment(client, db, admin_headers):
+    db.executemany(
+        "INSERT INTO students (first_name, last_name, phone, login, password) VALUES (?, ?, ?, ?, 'x')",
+        [('Ali', 'Valiyev', '+998901234567', 'ali'), ('Vali', 'Aliyev', '+998937654321', 'vali')]
+    )
+    sports_app.bump_versions(db.cursor(), 'students')
+    db.commit()
+
+    for path in ('/students', '/students/view'):
+        response = client.get(f'{path}?search=1234567', headers=admin_headers)
+        assert [student['first_name'] for student in response.json] == ['Ali']
+        response = client.get(f'{path}?search=Aliyev', headers=admin_headers)
+        assert [student['first_name'] for student in response.json] == ['Vali']
+
+
+def test_deleted_sport_type_leaves_coach_search(client, db, admin_headers):
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO sport_types (name) VALUES ('Boxing')")
+    sport_id = cursor.lastrowid
+    cursor.execute(
+        "INSERT INTO coaches (first_name, last_name, sport_type_id, login, password) VALUES ('Aziz', 'Karimov', ?, 'aziz', 'x')",
+        (sport_id,)
+    )
+    db.commit()
+    assert client.get('/coaches?search=boxing', headers=admin_headers).json[0]['first_name'] == 'Aziz'
+
+    response = client.delete(f'/sport-types/{sport_id}', headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get('/coaches?search=boxing', headers=admin_headers).json == []
@@ -0,0 +1,167 @@
+import gzip
+import io
+import json
+import os
+import sqlite3
+
+import pytest
+
+import app as sports_app
+
+
+def upload(client, headers, content, filename='notes.txt'):
+    return client.post('/sliders', headers=headers, content_type='multipart/form-data', data={
+        'school_name': 'School', 'image': (io.BytesIO(content), filename)
+    })
+
+
+def upload_path(app, path):
+    return os.path.join(app.config['UPLOAD_FOLDER'], path)
+
+
+def run_jobs():
+    sports_app.work_jobs('test-worker')
+
+
+def test_identical_uploads_share_a_blob_until_the_last_reference(app, client, admin_headers):
+    first = upload(client, admin_headers, b'same content').get_json()['id']
+    second = upload(client, admin_headers, b'same content').get_json()['id']
+    run_jobs()
+
+    with app.app_context():
+        db = sports_app.get_db()
+        paths = [row['image_path'] for row in db.execute("SELECT image_path FROM sliders ORDER BY id")]
+        blobs = db.execute("SELECT path, refcount FROM blobs").fetchall()
+    assert paths[0] == paths[1] and sports_app.is_blob(paths[0])
+    assert [tuple(blob) for blob in blobs] == [(paths[0], 2)]
+
+    assert client.delete(f'/sliders/{first}', headers=admin_headers).status_code == 200
+    run_jobs()
+    assert os.path.exists(upload_path(app, paths[0]))
+
+    assert client.delete(f'/sliders/{second}', headers=admin_headers).status_code == 200
+    run_jobs()
+    assert not os.path.exists(upload_path(app, paths[0]))
+    assert not os.path.exists(upload_path(app, paths[0] + '.gz'))
+
+
+def test_rolled_back_upload_leaves_no_file(app, client, admin_headers, monkeypatch):
+    def failing_bump(cursor, *names):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(sports_app, 'bump_versions', failing_bump)
+    with pytest.raises(sqlite3.OperationalError):
+        upload(client, admin_headers, b'never committed')
+    monkeypatch.undo()
+
+    with app.app_context():
+        db = sports_app.get_db()
+        assert db.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+        job = db.execute("SELECT kind, payload FROM jobs").fetchone()
+    path = json.loads(job['payload'])['path']
+    assert job['kind'] == 'delete_file' and os.path.exists(upload_path(app, path))
+
+    run_jobs()
+    assert not os.path.exists(upload_path(app, path))
+
+
+def write_upload(app, path, content):
+    filepath = upload_path(app, path)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'wb') as f:
+        f.write(content)
+
+
+@pytest.mark.parametrize('path', ['../secret.txt', '%2e%2e/secret.txt', 'news/../../secret.txt'])
+def test_serving_rejects_paths_outside_the_upload_folder(app, client, path):
+    with open(os.path.join(os.path.dirname(app.config['UPLOAD_FOLDER']), 'secret.txt'), 'w') as f:
+        f.write('secret')
+    response = client.get(f'/uploads/{path}')
+    assert response.status_code == 404
+    assert response.get_json() == {'message': 'File not found!'}
+
+
+def test_serving_rejects_dotfiles_and_upload_spools(app, client):
+    write_upload(app, 'news/.hidden', b'hidden')
+    write_upload(app, f'{sports_app.BLOB_FOLDER}/.upload-1234', b'half received')
+    write_upload(app, 'news/visible.txt', b'visible')
+    assert client.get('/uploads/news/.hidden').status_code == 404
+    assert client.get(f'/uploads/{sports_app.BLOB_FOLDER}/.upload-1234').status_code == 404
+    assert client.get('/uploads/news/visible.txt').status_code == 200
+
+
+def test_serving_answers_range_requests(app, client):
+    write_upload(app, 'news/photo.jpg', bytes(range(256)))
+    response = client.get('/uploads/news/photo.jpg', headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206
+    assert response.data == bytes(range(10, 20))
+    assert response.headers['Content-Range'] == 'bytes 10-19/256'
+    assert 'immutable' in response.headers['Cache-Control']
+
+
+def test_serving_picks_a_precompressed_copy(app, client):
+    body = b'line of text\n' * 500
+    write_upload(app, 'news/notes.txt', body)
+    sports_app.precompress_file('news/notes.txt')
+
+    # brotli is optional; without it only the .gz copy exists
+    for encoding in ('gzip',) if sports_app.brotli is None else ('br', 'gzip'):
+        response = client.get('/uploads/news/notes.txt', headers={'Accept-Encoding': encoding})
+        assert response.headers['Content-Encoding'] == encoding
+        assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == body
+
+    plain = client.get('/uploads/news/notes.txt')
+    assert 'Content-Encoding' not in plain.headers and plain.data == body
+
+
+def spool_files(app):
+    folder = upload_path(app, sports_app.BLOB_FOLDER)
+    return [name for name in os.listdir(folder) if name.startswith('.upload-')]
+
+
+def test_file_over_max_file_size_is_a_413(app, client, admin_headers):
+    app.config['MAX_FILE_SIZE'] = 1024
+    response = upload(client, admin_headers, b'x' * 4096)
+    assert response.status_code == 413
+    assert response.get_json() == {'message': 'File is too large!'}
+    assert spool_files(app) == []
+    assert upload(client, admin_headers, b'x' * 1024).status_code == 200
+
+
+def test_spools_of_rejected_uploads_are_removed(app, client, admin_headers):
+    response = client.post('/sliders', headers=admin_headers, content_type='multipart/form-data', data={
+        'image': (io.BytesIO(b'no school name'), 'notes.txt')
+    })
+    assert response.status_code == 400
+    assert spool_files(app) == []
+
+
+def test_spools_of_aborted_uploads_are_removed(app, client, admin_headers):
+    boundary = 'boundary'
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="notes.txt"\r\n'
+        'Content-Type: text/plain\r\n\r\n'
+    ).encode() + b'x' * 1000
+    # The client promises more than it sends, then goes away
+    response = client.post('/sliders', headers=dict(admin_headers, **{'Content-Length': str(len(body) + 5000)}),
+                           content_type=f'multipart/form-data; boundary={boundary}', input_stream=io.BytesIO(body))
+    assert response.status_code == 400
+    assert spool_files(app) == []
+
+
+def test_decompression_bomb_is_skipped_without_retries(app, client, admin_headers, monkeypatch, caplog):
+    # Pillow is optional; without it images are stored but never processed
+    Image = pytest.importorskip('PIL.Image')
+    image = io.BytesIO()
+    Image.new('RGB', (64, 64)).save(image, 'PNG')
+    assert upload(client, admin_headers, image.getvalue(), 'photo.png').status_code == 200
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 100)
+    run_jobs()
+
+    with app.app_context():
+        db = sports_app.get_db()
+        job = db.execute("SELECT status, attempts FROM jobs WHERE kind = 'process_image'").fetchone()
+        assert tuple(job) == ('done', 1)
+        assert db.execute("SELECT COUNT(*) FROM image_variants").fetchone()[0] == 0
+    assert len([record for record in caplog.records if 'oversized image' in record.getMessage()]) == 1